@@ -6,3 +6,8 @@ from message.common.graphql.relay import TortoiseORMNode
 class EndpointTortoiseORMNode(TortoiseORMNode):
     class Meta:
         model = models.Endpoint
+
+
+class EndpointImportTortoiseORMNode(TortoiseORMNode):
+    class Meta:
+        model = models.EndpointImport
@@ -3,15 +3,21 @@ import typing
 
 # Third Party Library
 import strawberry
+from message.common.constants import EndpointImportFormatEnum
 from message.common.graphql.relay import TortoiseORMPaginationConnection
 from message.common.graphql.relay import connection
 from message.exceptions.endpoint import EndpointNotFoundError
 from message.wiring import ApplicationContainer
 from strawberry import relay
+from strawberry.file_uploads import Upload
 
 # Local Folder
+from .objecttypes import EndpointImportTortoiseORMNode
 from .objecttypes import EndpointTortoiseORMNode
 
+# bytes read from an uploaded file at once
+ENDPOINT_IMPORT_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 @strawberry.type(description="Endpoint API")
 class Query:
@@ -32,12 +38,42 @@ class Query:
             conditions["contact_id__in"] = [int(id.node_id) for id in contact_ids]
         return await application.get_many(conditions)
 
+    @connection(TortoiseORMPaginationConnection[EndpointImportTortoiseORMNode])
+    async def endpoint_imports(
+        self,
+        ids: typing.Optional[typing.List[relay.GlobalID]] = None,
+    ) -> typing.AsyncIterable[EndpointImportTortoiseORMNode]:
+        application = ApplicationContainer.endpoint_import_application()
+        conditions = {}
+        if ids:
+            conditions["id__in"] = [int(id.node_id) for id in ids]
+        return await application.get_many(conditions, order_by=("-id",))
+
 
 @strawberry.type(description="Endpoint API")
 class Mutation:
-    @strawberry.mutation(description="Import endpoints", deprecation_reason="not ready")
-    async def endpoint_import(self) -> str:
-        return "not ready"
+    @strawberry.mutation(description="Import endpoints from a csv or ndjson file")
+    async def endpoint_import(
+        self,
+        file: Upload,
+        format: typing.Optional[
+            strawberry.enum(EndpointImportFormatEnum)  # type: ignore
+        ] = None,
+    ) -> EndpointImportTortoiseORMNode:
+        application = ApplicationContainer.endpoint_import_application()
+        if format is None:
+            format = (
+                EndpointImportFormatEnum.NDJSON
+                if (file.filename or "").endswith((".ndjson", ".jsonl"))
+                else EndpointImportFormatEnum.CSV
+            )
+
+        async def chunks():
+            while chunk := await file.read(ENDPOINT_IMPORT_UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+        endpoint_import = await application.create_import(chunks(), format)
+        return await EndpointImportTortoiseORMNode.resolve_orm(endpoint_import)
 
     @strawberry.mutation(description="Create endpoint")
     async def endpoint_create(
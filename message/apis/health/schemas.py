@@ -30,6 +30,7 @@ class Subscription:
         refresh_interval = TypeAdapter(conint(gt=0, lt=900)).validate_python(
             refresh_interval
         )
+        # health is sampled in background, subscribers only read the cache
         while True:
             yield await application.get_service_health()
             await anyio.sleep(refresh_interval)
@@ -1,8 +1,22 @@
+# Standard Library
+import typing
+
 # Third Party Library
+import strawberry
 from message import models
 from message.common.graphql.relay import TortoiseORMNode
+from strawberry import relay
 
 
 class MessageTortoiseORMNode(TortoiseORMNode):
     class Meta:
         model = models.Message
+
+
+@strawberry.input
+class MessageSendInput:
+    provider: relay.GlobalID
+    content: strawberry.scalars.JSON
+    users: typing.Optional[typing.List[relay.GlobalID]] = None
+    endpoints: typing.Optional[typing.List[relay.GlobalID]] = None
+    contacts: typing.Optional[typing.List[strawberry.scalars.JSON]] = None
@@ -1,25 +1,47 @@
 # Standard Library
 import asyncio
-import time
+import datetime
 import typing
 
 # Third Party Library
 import orjson
 import strawberry
-from message import applications
-from message import exceptions
+from message.common.constants import MESSAGE_STATUS_CHANNEL
 from message.common.constants import MessageStatusEnum
+from message.common.graphql.count import CountStrategy
+from message.common.graphql.relay import TortoiseORMCursorConnection
 from message.common.graphql.relay import TortoiseORMPaginationConnection
 from message.common.graphql.relay import connection
+from message.infra import get_infra
+from message.wiring import ApplicationContainer
 from strawberry import relay
 
 # Local Folder
+from .objecttypes import MessageSendInput
 from .objecttypes import MessageTortoiseORMNode
 
 
+def build_message_filters(provider, users, endpoints, statuses) -> dict:
+    filters = {}
+    if provider is not None:
+        filters["provider_id__in"] = [provider.node_id for provider in provider]
+    if users is not None:
+        filters["end_users__id__in"] = [user.node_id for user in users]
+    if endpoints is not None:
+        filters["endpoints__id__in"] = [endpoint.node_id for endpoint in endpoints]
+    if statuses is not None:
+        filters["status__in"] = [status.value for status in statuses]
+    return filters
+
+
 @strawberry.type(description="Message API")
 class Query:
-    @connection(TortoiseORMPaginationConnection[MessageTortoiseORMNode])
+    # dashboards poll messages, so totals are shared among them for a while
+    @connection(
+        TortoiseORMPaginationConnection[MessageTortoiseORMNode],
+        count_strategy=CountStrategy.CACHED,
+        count_cache_ttl=10,
+    )
     async def messages(
         self,
         provider: typing.Optional[typing.List[relay.GlobalID]] = None,
@@ -29,17 +51,26 @@ class Query:
             typing.List[strawberry.enum(MessageStatusEnum)]  # type: ignore
         ] = None,
     ) -> typing.AsyncIterable[MessageTortoiseORMNode]:
-        application = applications.MessageApplication()
-        filters = {}
-        if provider is not None:
-            filters["provider_id__in"] = [provider.node_id for provider in provider]
-        if users is not None:
-            filters["end_users__id__in"] = [user.node_id for user in users]
-        if endpoints is not None:
-            filters["endpoints__id__in"] = [endpoint.node_id for endpoint in endpoints]
-        if statuses is not None:
-            filters["status__in"] = [status.value for status in statuses]
-        return application.get_many(filters=filters)
+        application = ApplicationContainer.message_application()
+        filters = build_message_filters(provider, users, endpoints, statuses)
+        return await application.get_many(filters=filters)
+
+    @connection(
+        TortoiseORMCursorConnection[MessageTortoiseORMNode],
+        count_strategy=CountStrategy.ESTIMATED,
+    )
+    async def messages_by_cursor(
+        self,
+        provider: typing.Optional[typing.List[relay.GlobalID]] = None,
+        users: typing.Optional[typing.List[relay.GlobalID]] = None,
+        endpoints: typing.Optional[typing.List[relay.GlobalID]] = None,
+        statuses: typing.Optional[
+            typing.List[strawberry.enum(MessageStatusEnum)]  # type: ignore
+        ] = None,
+    ) -> typing.AsyncIterable[MessageTortoiseORMNode]:
+        application = ApplicationContainer.message_application()
+        filters = build_message_filters(provider, users, endpoints, statuses)
+        return await application.get_many(filters=filters)
 
 
 @strawberry.type(description="Message API")
@@ -53,19 +84,52 @@ class Mutation:
         endpoints: typing.Optional[typing.List[relay.GlobalID]] = None,
         contacts: typing.Optional[typing.List[strawberry.scalars.JSON]] = None,
     ) -> str:
-        message_application = applications.MessageApplication()
-        message_id = await message_application.send_message(
-            provider_id=provider.node_id,
-            content=orjson.dumps(content).decode(),
-            users=[user.node_id for user in users] if users else [],
-            endpoints=[endpoint.node_id for endpoint in endpoints] if endpoints else [],
-            contacts=contacts,
+        message_application = ApplicationContainer.message_application()
+        (message_id,) = await message_application.send_messages(
+            [
+                {
+                    "provider_id": int(provider.node_id),
+                    "content": orjson.dumps(content).decode(),
+                    "users": [int(user.node_id) for user in users or []],
+                    "endpoints": [
+                        int(endpoint.node_id) for endpoint in endpoints or []
+                    ],
+                    "contacts": contacts,
+                }
+            ]
         )
         return relay.GlobalID(
             type_name=MessageTortoiseORMNode.__name__,
-            node_id=message_id,
+            node_id=str(message_id),
         )
 
+    @strawberry.mutation(description="Send many messages to users at once")
+    async def message_send_batch(
+        self, messages: typing.List[MessageSendInput]
+    ) -> typing.List[relay.GlobalID]:
+        message_application = ApplicationContainer.message_application()
+        message_ids = await message_application.send_messages(
+            [
+                {
+                    "provider_id": int(message.provider.node_id),
+                    "content": orjson.dumps(message.content).decode(),
+                    "users": [int(user.node_id) for user in message.users or []],
+                    "endpoints": [
+                        int(endpoint.node_id) for endpoint in message.endpoints or []
+                    ],
+                    "contacts": message.contacts,
+                }
+                for message in messages
+            ]
+        )
+        return [
+            relay.GlobalID(
+                type_name=MessageTortoiseORMNode.__name__,
+                node_id=str(message_id),
+            )
+            for message_id in message_ids
+        ]
+
 
 @strawberry.type(description="Message API")
 class Subscription:
@@ -73,18 +137,31 @@ class Subscription:
     async def message(
         self, id: relay.GlobalID, interval: typing.Optional[int] = 1
     ) -> typing.AsyncGenerator[typing.Optional[MessageTortoiseORMNode], None]:
+        # interval only applies to waiting for the message to be created,
+        # status changes are pushed by distribution once it exists
         interval = max(interval, 1)
-        message = None
-        application = applications.MessageApplication()
+        message_id = int(id.node_id)
+        application = ApplicationContainer.message_application()
+        distribution = await get_infra().distribution()
 
-        while message is None:
-            try:
-                message = await application.get_message(id=int(id.node_id))
-            except exceptions.MessageNotFoundError:
-                message = None
-                yield message
+        # listen before taking the snapshot, so no transition is missed
+        async with distribution.listen(
+            MESSAGE_STATUS_CHANNEL.format(id=message_id)
+        ) as changes:
+            while (message := await application.get(id=message_id)) is None:
+                yield None
                 await asyncio.sleep(interval)
 
-        while message is not None:
-            yield await MessageTortoiseORMNode.resolve_orm(message)
-            await asyncio.sleep(interval)
+            node = MessageTortoiseORMNode.from_orm(message)
+            yield node
+
+            async for change in changes:
+                # transitions published before the snapshot are already in it
+                if len(change["status_history"]) <= len(node.status_history or []):
+                    continue
+                node = node.replace(
+                    status=change["status"],
+                    status_history=change["status_history"],
+                    updated_at=datetime.datetime.fromisoformat(change["updated_at"]),
+                )
+                yield node
@@ -24,3 +24,12 @@ class UserEndpointUpdateInput:
     id: typing.Optional[relay.GlobalID] = None
     contact: typing.Optional[relay.GlobalID] = None
     value: typing.Optional[strawberry.scalars.JSON] = None
+
+
+@strawberry.input
+class UserUpsertInput:
+    external_id: str
+    metadata: typing.Optional[strawberry.scalars.JSON] = None
+    is_active: typing.Optional[bool] = None
+    # replace all endpoints of the user if given, keep them if omitted
+    endpoints: typing.Optional[typing.List[UserEndpointAddInput]] = None
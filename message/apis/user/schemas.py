@@ -13,6 +13,7 @@ from strawberry import relay
 from .objecttypes import UserEndpointAddInput
 from .objecttypes import UserEndpointUpdateInput
 from .objecttypes import UserTortoiseORMNode
+from .objecttypes import UserUpsertInput
 
 
 @strawberry.type(description="User API")
@@ -66,6 +67,34 @@ class Mutation:
         )
         return await UserTortoiseORMNode.resolve_orm(created)
 
+    @strawberry.mutation(description="Create or update users by external id")
+    async def users_upsert(
+        self, users: typing.List[UserUpsertInput]
+    ) -> typing.List[UserTortoiseORMNode]:
+        application = ApplicationContainer.user_application()
+        upserted = await application.upsert_many(
+            [
+                {
+                    "external_id": user.external_id,
+                    "metadata": user.metadata,
+                    "is_active": user.is_active,
+                    "endpoints": (
+                        None
+                        if user.endpoints is None
+                        else [
+                            {
+                                "contact_id": int(endpoint.contact.node_id),
+                                "value": endpoint.value,
+                            }
+                            for endpoint in user.endpoints
+                        ]
+                    ),
+                }
+                for user in users
+            ]
+        )
+        return [UserTortoiseORMNode.from_orm(user) for user in upserted]
+
     @strawberry.mutation(description="Update user")
     async def user_update(
         self,
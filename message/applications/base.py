@@ -1,16 +1,188 @@
 # Standard Library
+import asyncio
+import functools
 import typing
 from contextlib import suppress
 
 # Third Party Library
+import orjson
+from message.common.constants import APPLICATION_CACHE_CHANNEL
+from message.common.constants import APPLICATION_CACHE_KEY
+from message.common.constants import APPLICATION_CACHE_LOCAL_TTL
+from message.common.constants import APPLICATION_CACHE_REDIS_TTL
+from message.common.constants import APPLICATION_CACHE_SIZE
+from message.common.constants import INVALIDATION_RETRY_DELAY
+from message.common.constants import INVALIDATION_RETRY_MAX_DELAY
 from message.common.models import BaseModel
+from message.helpers.cache import LRUCache
 from message.helpers.decorators import ensure_infra
+from message.helpers.transactions import is_in_transaction
+from message.helpers.transactions import on_commit
+from message.infra import get_infra
+from tortoise.fields import JSONField
 from tortoise.queryset import QuerySet
 from tortoise.timezone import now
 
 T = typing.TypeVar("T", bound=BaseModel)
 
 
+def as_ids(id: typing.Union[int, str, typing.Iterable[int]]) -> typing.List[int]:
+    """
+    Normalize an id or ids to a list of ids.
+    """
+    if isinstance(id, (int, str)):
+        return [id]
+    return list(id)
+
+
+def ids_of_filters(filters: dict) -> typing.Optional[typing.List[int]]:
+    """
+    Ids of all domains which `filters` may match, or None if the filters are
+    not narrowed by ids.
+    """
+    for key in ("id", "id__in"):
+        if key in filters:
+            return as_ids(filters[key])
+    return None
+
+
+class ApplicationCache(typing.Generic[T]):
+    """
+    Two-tier read-through cache of domain models by id.
+
+    Domains are cached as rows in redis, shared by all processes, and in an
+    LRU of this process. Every process drops its copies when an invalidation
+    is published, and copies expire by ttl in case any invalidation is lost.
+    Each read builds a new domain, so callers never share a mutable domain.
+
+    Invalidations within a transaction of `message.helpers.transactions` are
+    published after it commits, and reads within it bypass the cache, so
+    rows not committed yet are never cached.
+    """
+
+    def __init__(
+        self,
+        model_class: typing.Type[T],
+        maxsize: int = APPLICATION_CACHE_SIZE,
+        local_ttl: float = APPLICATION_CACHE_LOCAL_TTL,
+        redis_ttl: int = APPLICATION_CACHE_REDIS_TTL,
+    ) -> None:
+        self.model_class = model_class
+        self.table = model_class._meta.db_table
+        self.channel = APPLICATION_CACHE_CHANNEL.format(table=self.table)
+        self.local: LRUCache[int, bytes] = LRUCache(maxsize, ttl=local_ttl)
+        self.redis_ttl = redis_ttl
+        self.listener: typing.Optional[asyncio.Task] = None
+        # copies are kept in process only while invalidations are received
+        self.listening = False
+
+    def key(self, id: int) -> str:
+        return APPLICATION_CACHE_KEY.format(table=self.table, id=id)
+
+    def dumps(self, domain: T) -> bytes:
+        meta = self.model_class._meta
+        return orjson.dumps(
+            {
+                column: getattr(domain, name)
+                for name, column in meta.fields_db_projection.items()
+            }
+        )
+
+    def loads(self, data: bytes) -> T:
+        meta = self.model_class._meta
+        row = orjson.loads(data)
+        # json fields are given as text, as they are read from database
+        for column, _, field in meta.db_complex_fields:
+            if isinstance(field, JSONField):
+                row[column] = orjson.dumps(row[column]).decode()
+        for column, _, field in meta.db_native_fields:
+            value = row[column]
+            if isinstance(field, JSONField):
+                value = orjson.dumps(value).decode()
+            row[column] = field.to_python_value(value)
+        return self.model_class._init_from_db(**row)
+
+    async def get(
+        self, id: int, load: typing.Callable[[], typing.Awaitable[T | None]]
+    ) -> T | None:
+        """
+        Get a domain from process, then redis, then `load` it from database.
+        """
+        if is_in_transaction():
+            return await load()
+        id = int(id)
+        self.start_listener()
+        if (data := self.local.get(id)) is not None:
+            return self.loads(data)
+
+        redis = None
+        with suppress(Exception):
+            redis = (await get_infra().cache()).redis
+            data = await redis.get(self.key(id))
+        if data is None:
+            domain = await load()
+            if domain is None:
+                return None
+            data = self.dumps(domain)
+            if redis is not None:
+                with suppress(Exception):
+                    await redis.set(self.key(id), data, ex=self.redis_ttl)
+        else:
+            domain = self.loads(data)
+
+        if self.listening:
+            self.local.set(id, data)
+        return domain
+
+    async def invalidate(self, *ids: int) -> None:
+        """
+        Drop cached domains from redis and from all processes, after current
+        transaction is committed.
+        """
+        ids = [int(id) for id in ids]
+        if ids:
+            await on_commit(functools.partial(self.drop, ids))
+
+    async def drop(self, ids: typing.List[int]) -> None:
+        for id in ids:
+            self.local.pop(id)
+        with suppress(Exception):
+            redis = (await get_infra().cache()).redis
+            await redis.delete(*(self.key(id) for id in ids))
+        with suppress(Exception):
+            distribution = await get_infra().distribution()
+            await distribution.publish(self.channel, ids)
+
+    def start_listener(self) -> None:
+        if self.listener is None:
+            self.listener = asyncio.create_task(self.listen())
+
+    async def listen(self) -> None:
+        """
+        Drop copies invalidated by other processes, listen again after
+        failures with backoff, copies are not kept in the meantime.
+        """
+        delay = INVALIDATION_RETRY_DELAY
+        while True:
+            try:
+                distribution = await get_infra().distribution()
+                async with distribution.listen(self.channel) as invalidations:
+                    self.listening = True
+                    delay = INVALIDATION_RETRY_DELAY
+                    async for ids in invalidations:
+                        for id in ids:
+                            self.local.pop(id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                print(err)
+            finally:
+                self.listening = False
+                self.local.clear()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, INVALIDATION_RETRY_MAX_DELAY)
+
+
 class Application(typing.Generic[T]):
     """
     Base class of Application
@@ -18,6 +190,10 @@ class Application(typing.Generic[T]):
     Application provides methods for controling domain models.
     """
 
+    # enable read-through cache of `get`, for tiny and rarely changed tables
+    cache_enabled: typing.ClassVar[bool] = False
+    cache: typing.ClassVar[typing.Optional[ApplicationCache]] = None
+
     def __init_subclass__(cls) -> None:
         """
         Require subclass to set `model_class` attribute.
@@ -29,12 +205,20 @@ class Application(typing.Generic[T]):
             cls.model_class, BaseModel
         ), "model_class attribute must be a subclass of BaseModel"
         cls.__annotations__["model_class"] = cls.model_class
+        if cls.cache_enabled and (
+            cls.cache is None or cls.cache.model_class is not cls.model_class
+        ):
+            cls.cache = ApplicationCache(cls.model_class)
 
     @ensure_infra("persistence")
     async def get(self, id: int, **kwargs) -> T | None:
         """
         Get a domain model by id.
         """
+        if self.cache is not None and not kwargs:
+            return await self.cache.get(
+                id, lambda: self.model_class.active_objects.get_or_none(id=id)
+            )
         return await self.model_class.active_objects.get_or_none(id=id, **kwargs)
 
     @ensure_infra("persistence")
@@ -112,6 +296,8 @@ class Application(typing.Generic[T]):
         domain = self.model_class(**kwargs)
         await domain.validate(raise_exception=True)
         await domain.save()
+        if self.cache is not None:
+            await self.cache.invalidate(domain.id)
         return domain
 
     @ensure_infra("persistence")
@@ -122,28 +308,41 @@ class Application(typing.Generic[T]):
         domain.update_from_dict(kwargs)
         await domain.validate(raise_exception=True)
         await domain.save()
+        if self.cache is not None:
+            await self.cache.invalidate(domain.id)
         return domain
 
     @ensure_infra("persistence")
-    async def delete(self, id: int) -> bool:
+    async def delete(self, id: typing.Union[int, typing.Iterable[int]]) -> bool:
         """
-        Delete domain models by id.
+        Delete domain models by id, or by ids.
         """
-        with suppress(Exception):
-            await self.model_class.active_objects.filter(id__in=id).update(
+        ids = as_ids(id)
+        try:
+            await self.model_class.active_objects.filter(id__in=ids).update(
                 is_deleted=True, deleted_at=now()
             )
-            return True
-        return False
+        except Exception:
+            return False
+        if self.cache is not None:
+            await self.cache.invalidate(*ids)
+        return True
 
     @ensure_infra("persistence")
     async def delete_many(self, filters: dict) -> bool:
         """
         Delete domain models by filters.
         """
-        with suppress(Exception):
-            await self.model_class.active_objects.filter(**filters).update(
-                is_deleted=True, deleted_at=now()
-            )
-            return True
-        return False
+        qs = self.model_class.active_objects.filter(**filters)
+        try:
+            # ids are queried only if they are needed by the cache and not
+            # given by the filters
+            if self.cache is not None and (ids := ids_of_filters(filters)) is None:
+                ids = await qs.values_list("id", flat=True)
+                qs = self.model_class.active_objects.filter(id__in=ids)
+            await qs.update(is_deleted=True, deleted_at=now())
+        except Exception:
+            return False
+        if self.cache is not None:
+            await self.cache.invalidate(*ids)
+        return True
@@ -10,6 +10,7 @@ class ContactApplication(Application[models.Contact]):
 
     # required by Application[models.Contact]
     model_class = models.Contact
+    cache_enabled = True
 
     async def validate_contact_value(
         self, contact: models.Contact, contact_value: str | dict
@@ -1,7 +1,37 @@
+# Standard Library
+import csv
+import io
+import typing
+from collections import defaultdict
+
 # Third Party Library
+import orjson
+from blinker import signal
 from message import models
 from message.applications.base import Application
+from message.common.constants import ENDPOINT_IMPORT_CHUNK_SIZE
+from message.common.constants import ENDPOINT_IMPORT_MAX_ERRORS
+from message.common.constants import SIGNALS
+from message.common.constants import EndpointImportFormatEnum
+from message.common.constants import EndpointImportStatusEnum
+from message.helpers.decorators import ensure_infra
+from message.helpers.transactions import in_transaction
+from message.infra import get_infra
+from tortoise.expressions import Q
 from tortoise.queryset import QuerySet
+from tortoise.timezone import now
+from ulid import ULID
+
+endpoint_import_signal = signal(SIGNALS.ENDPOINT_IMPORT)
+
+
+class Recipients(typing.NamedTuple):
+    """
+    Valid contact values of users and endpoints, by their ids.
+    """
+
+    of_users: typing.Dict[int, typing.List[typing.Any]]
+    of_endpoints: typing.Dict[int, typing.Any]
 
 
 class EndpointApplication(Application[models.Endpoint]):
@@ -26,3 +56,339 @@ class EndpointApplication(Application[models.Endpoint]):
         return await super().get_queryset(
             filters, limit, offset, order_by, for_update, use_index, use_db
         )
+
+    @ensure_infra("persistence")
+    async def expand_recipients(
+        self,
+        users: typing.Iterable[int] = (),
+        endpoints: typing.Iterable[int | str] = (),
+        contact_codes: typing.Optional[typing.Iterable[str]] = None,
+    ) -> Recipients:
+        """
+        Expand users and endpoints into their valid contact values.
+
+        Endpoints of users and endpoints themselves are fetched by one query,
+        then grouped by contact, so each contact definition is compiled once
+        to validate all its values.
+
+        Args:
+            users (Iterable[int]): Ids of users to send to all their endpoints.
+            endpoints (Iterable[int | str]): Ids of endpoints to send to.
+            contact_codes (Iterable[str], optional): Codes of contacts to expand.
+
+        Returns:
+            Recipients: Valid contact values of users and endpoints.
+        """
+        user_ids = {int(user) for user in users}
+        endpoint_ids = {int(endpoint) for endpoint in endpoints}
+        recipients = Recipients(of_users=defaultdict(list), of_endpoints={})
+        if not user_ids and not endpoint_ids:
+            return recipients
+
+        qs = self.model_class.active_objects.filter(
+            Q(user_id__in=user_ids) | Q(id__in=endpoint_ids)
+        )
+        if contact_codes is not None:
+            qs = qs.filter(contact__code__in=list(contact_codes))
+
+        endpoints_of_contacts = defaultdict(list)
+        contacts = {}
+        for endpoint in await qs.select_related("contact"):
+            contacts[endpoint.contact_id] = endpoint.contact
+            endpoints_of_contacts[endpoint.contact_id].append(endpoint)
+
+        for contact_id, contact_endpoints in endpoints_of_contacts.items():
+            results = contacts[contact_id].validate_endpoint_values(
+                endpoint.value for endpoint in contact_endpoints
+            )
+            for endpoint, result in zip(contact_endpoints, results):
+                if not result.valid:
+                    continue
+                if endpoint.user_id in user_ids:
+                    recipients.of_users[endpoint.user_id].append(result.validated_data)
+                if endpoint.id in endpoint_ids:
+                    recipients.of_endpoints[endpoint.id] = result.validated_data
+        return recipients
+
+
+class EndpointImportApplication(Application[models.EndpointImport]):
+    """
+    Endpoint Import Application
+    """
+
+    # required by Application
+    model_class = models.EndpointImport
+
+    @ensure_infra("persistence", "storage")
+    async def create_import(
+        self,
+        chunks: typing.AsyncIterable[bytes],
+        format: EndpointImportFormatEnum,
+    ) -> models.EndpointImport:
+        """
+        Save an uploaded file of endpoints, and import it in background.
+
+        Each row of the file has `external_id` of a user, `contact` code and
+        `value` of the endpoint. A csv file starts with a header of these
+        columns, and a ndjson file has an object of them per line.
+
+        Args:
+            chunks (AsyncIterable[bytes]): Content of the uploaded file.
+            format (EndpointImportFormatEnum): Format of the uploaded file.
+
+        Returns:
+            EndpointImport: The import job, to query its progress.
+        """
+        format = EndpointImportFormatEnum(format)
+        name = f"endpoint_import_{ULID()}.{format.value}"
+        storage = await get_infra().storage()
+        await storage.write_stream(name, chunks)
+
+        endpoint_import = await self.create(file=name, format=format)
+        await endpoint_import_signal.send_async(self, import_id=endpoint_import.id)
+        return endpoint_import
+
+    @ensure_infra("persistence", "storage")
+    async def run_import(
+        self,
+        endpoint_import: models.EndpointImport,
+        chunk_size: int = ENDPOINT_IMPORT_CHUNK_SIZE,
+    ) -> models.EndpointImport:
+        """
+        Import endpoints of a saved file by chunks, progress is saved after
+        each chunk.
+
+        Users missed by `external_id` are created, rows with unknown contact
+        or invalid value are counted as failed and do not stop the import.
+        Endpoints existed already are skipped, so a file could be imported
+        again safely.
+        """
+        endpoint_import.status = EndpointImportStatusEnum.RUNNING
+        await endpoint_import.save(update_fields=["status", "updated_at"])
+
+        contacts = {
+            contact.code: contact
+            for contact in await models.Contact.active_objects.all()
+        }
+        storage = await get_infra().storage()
+        try:
+            rows = self.read_rows(
+                storage.stream(endpoint_import.file), endpoint_import.format
+            )
+            chunk = []
+            async for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    await self.import_chunk(endpoint_import, chunk, contacts)
+                    chunk = []
+            if chunk:
+                await self.import_chunk(endpoint_import, chunk, contacts)
+        except Exception as error:
+            endpoint_import.status = EndpointImportStatusEnum.FAILED
+            self.add_errors(endpoint_import, [{"line": None, "error": str(error)}])
+            raise
+        else:
+            endpoint_import.status = EndpointImportStatusEnum.SUCCEEDED
+            await storage.delete(endpoint_import.file)
+        finally:
+            endpoint_import.finished_at = now()
+            await endpoint_import.save(
+                update_fields=["status", "errors", "finished_at", "updated_at"]
+            )
+        return endpoint_import
+
+    async def read_rows(
+        self,
+        chunks: typing.AsyncIterable[bytes],
+        format: EndpointImportFormatEnum,
+    ) -> typing.AsyncIterator[typing.Tuple[int, typing.Any]]:
+        """
+        Parse rows from chunks of a file, with their line numbers.
+
+        A row failed to parse is yielded as its error message.
+        """
+        if format == EndpointImportFormatEnum.CSV:
+            records = self.read_csv_records(chunks)
+        else:
+            records = self.read_lines(chunks)
+
+        header = None
+        async for number, record in records:
+            if not record.strip():
+                continue
+            try:
+                if format == EndpointImportFormatEnum.CSV:
+                    text = io.StringIO(record.decode("utf-8-sig"), newline="")
+                    if header is None:
+                        header = next(csv.reader(text))
+                        continue
+                    row = next(csv.DictReader(text, fieldnames=header))
+                else:
+                    row = orjson.loads(record)
+                    if not isinstance(row, dict):
+                        raise ValueError("row must be an object")
+            except (ValueError, csv.Error) as error:
+                yield number, f"failed to parse: {error}"
+            else:
+                yield number, row
+
+    async def read_csv_records(
+        self, chunks: typing.AsyncIterable[bytes]
+    ) -> typing.AsyncIterator[typing.Tuple[int, bytes]]:
+        """
+        Join lines of a csv file into records, with line numbers they start
+        at. A quoted value may span lines, so a record ends at a line where
+        quotes are balanced.
+        """
+        start, lines, quotes = 0, [], 0
+        async for number, line in self.read_lines(chunks):
+            if not lines:
+                start = number
+            lines.append(line)
+            quotes += line.count(b'"')
+            if quotes % 2 == 0:
+                yield start, b"\n".join(lines)
+                lines, quotes = [], 0
+        if lines:
+            yield start, b"\n".join(lines)
+
+    async def read_lines(
+        self, chunks: typing.AsyncIterable[bytes]
+    ) -> typing.AsyncIterator[typing.Tuple[int, bytes]]:
+        number, rest = 0, b""
+        async for chunk in chunks:
+            *lines, rest = (rest + chunk).split(b"\n")
+            for line in lines:
+                number += 1
+                yield number, line
+        if rest:
+            yield number + 1, rest
+
+    @ensure_infra("persistence")
+    async def import_chunk(
+        self,
+        endpoint_import: models.EndpointImport,
+        rows: typing.List[typing.Tuple[int, typing.Any]],
+        contacts: typing.Dict[str, models.Contact],
+    ) -> None:
+        """
+        Validate and insert a chunk of rows, and save progress of the import.
+        """
+        errors = []
+        rows_of_contacts = defaultdict(list)
+        for number, row in rows:
+            if isinstance(row, str):
+                errors.append({"line": number, "error": row})
+                continue
+            external_id = str(row.get("external_id") or "").strip()
+            contact = contacts.get(row.get("contact"))
+            value = row.get("value")
+            if not external_id or contact is None or not value:
+                errors.append(
+                    {
+                        "line": number,
+                        "error": "external_id, contact and value are required",
+                    }
+                )
+                continue
+            if isinstance(value, str):
+                value = {"regex": value}
+            rows_of_contacts[contact.code].append((number, external_id, value))
+
+        valid_rows = []
+        for code, contact_rows in rows_of_contacts.items():
+            contact = contacts[code]
+            results = contact.validate_endpoint_values(
+                value for _, _, value in contact_rows
+            )
+            for (number, external_id, value), result in zip(contact_rows, results):
+                if result.valid:
+                    valid_rows.append((external_id, contact, result.validated_data))
+                else:
+                    errors.append({"line": number, "error": "invalid value"})
+
+        async with in_transaction():
+            users = await self.get_or_create_users(
+                {external_id for external_id, _, _ in valid_rows}
+            )
+            await models.Endpoint.bulk_create(
+                await self.dedupe_endpoints(
+                    [
+                        models.Endpoint(
+                            user_id=users[external_id], contact=contact, value=value
+                        )
+                        for external_id, contact, value in valid_rows
+                    ]
+                )
+            )
+
+        endpoint_import.total += len(rows)
+        endpoint_import.imported += len(valid_rows)
+        endpoint_import.failed += len(errors)
+        self.add_errors(endpoint_import, errors)
+        await endpoint_import.save(
+            update_fields=["total", "imported", "failed", "errors", "updated_at"]
+        )
+
+    async def get_or_create_users(
+        self, external_ids: typing.Set[str]
+    ) -> typing.Dict[str, int]:
+        """
+        Get ids of users by external ids, create users which are not existed,
+        and revive users deleted before, as external ids are unique.
+        """
+        users, deleted = {}, []
+        for external_id, id, is_deleted in await models.User.filter(
+            external_id__in=external_ids
+        ).values_list("external_id", "id", "is_deleted"):
+            users[external_id] = id
+            if is_deleted:
+                deleted.append(id)
+        if deleted:
+            await models.User.filter(id__in=deleted).update(
+                is_deleted=False, deleted_at=None
+            )
+        if missing := external_ids - users.keys():
+            await models.User.bulk_create(
+                [models.User(external_id=external_id) for external_id in missing],
+                ignore_conflicts=True,
+            )
+            users.update(
+                await models.User.filter(external_id__in=missing).values_list(
+                    "external_id", "id"
+                )
+            )
+        return users
+
+    async def dedupe_endpoints(
+        self, endpoints: typing.List[models.Endpoint]
+    ) -> typing.List[models.Endpoint]:
+        """
+        Drop endpoints existed already, or given more than once, by user,
+        contact and value, so importing a file again adds nothing.
+        """
+
+        def key(user_id, contact_id, value):
+            return user_id, contact_id, orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+
+        if not endpoints:
+            return []
+        seen = {
+            key(*existed)
+            for existed in await models.Endpoint.active_objects.filter(
+                user_id__in={endpoint.user_id for endpoint in endpoints},
+                contact_id__in={endpoint.contact_id for endpoint in endpoints},
+            ).values_list("user_id", "contact_id", "value")
+        }
+        deduped = []
+        for endpoint in endpoints:
+            endpoint_key = key(endpoint.user_id, endpoint.contact_id, endpoint.value)
+            if endpoint_key not in seen:
+                seen.add(endpoint_key)
+                deduped.append(endpoint)
+        return deduped
+
+    def add_errors(self, endpoint_import: models.EndpointImport, errors: list):
+        room = ENDPOINT_IMPORT_MAX_ERRORS - len(endpoint_import.errors)
+        if room > 0 and errors:
+            endpoint_import.errors = [*endpoint_import.errors, *errors[:room]]
@@ -1,5 +1,14 @@
+# Standard Library
+import asyncio
+import typing
+
 # Third Party Library
+from apscheduler.job import Job
+from apscheduler.triggers.interval import IntervalTrigger
+from message.common.constants import HEALTH_CHECK_TIMEOUT
+from message.common.constants import HEALTH_SAMPLE_INTERVAL
 from message.infra import get_infra
+from message.infra.abc import CheckResult
 from message.infra.abc import HealthStatus
 from pydantic import BaseModel
 
@@ -15,16 +24,83 @@ class ServiceHealthStatus(BaseModel):
 class HealthApplication:
     def __init__(self) -> None:
         self.infra = get_infra()
+        # the last sampled health, shared by all queries and subscriptions
+        self.service_health: typing.Optional[ServiceHealthStatus] = None
+        self.sampler: typing.Optional[Job] = None
 
     async def get_service_health(self) -> ServiceHealthStatus:
-        return ServiceHealthStatus(
-            cache=await self.get_cache_health(),
-            persistence=await self.get_persistence_health(),
-            storage=await self.get_storage_health(),
-            websocket=await self.get_websocket_health(),
-            background=await self.get_background_health(),
+        """
+        Get the last sampled health of services, sample it if never sampled.
+        """
+        if self.service_health is None:
+            return await self.refresh_service_health()
+        return self.service_health
+
+    async def refresh_service_health(
+        self, timeout: float = HEALTH_CHECK_TIMEOUT
+    ) -> ServiceHealthStatus:
+        """
+        Run all health checks concurrently and cache the result.
+
+        Each check is limited by `timeout` seconds, a slow or failed check is
+        reported as down without delaying the others.
+        """
+        checks = {
+            "cache": self.get_cache_health,
+            "persistence": self.get_persistence_health,
+            "storage": self.get_storage_health,
+            "websocket": self.get_websocket_health,
+            "background": self.get_background_health,
+        }
+        results = await asyncio.gather(
+            *(
+                self.check_with_timeout(name, check, timeout)
+                for name, check in checks.items()
+            )
+        )
+        self.service_health = ServiceHealthStatus(**dict(zip(checks, results)))
+        return self.service_health
+
+    async def check_with_timeout(
+        self,
+        name: str,
+        check: typing.Callable[[], typing.Awaitable[HealthStatus]],
+        timeout: float,
+    ) -> HealthStatus:
+        try:
+            return await asyncio.wait_for(check(), timeout=timeout)
+        except asyncio.TimeoutError:
+            result = f"timeout after {timeout}s"
+        except Exception as error:
+            result = str(error)
+        return HealthStatus(
+            status="down",
+            checks=[
+                CheckResult(check=f"{name} health check", status="down", result=result)
+            ],
         )
 
+    async def start_sampler(self, interval: int = HEALTH_SAMPLE_INTERVAL) -> None:
+        """
+        Sample health in background every `interval` seconds.
+        """
+        await self.refresh_service_health()
+        if self.sampler is not None:
+            return
+        background = await self.infra.background_scheduler()
+        self.sampler = background.run_task_in_async_executor(
+            self.refresh_service_health,
+            trigger=IntervalTrigger(seconds=interval),
+        )
+
+    async def stop_sampler(self) -> None:
+        if self.sampler is not None:
+            try:
+                self.sampler.remove()
+            except Exception:
+                pass
+            self.sampler = None
+
     async def get_cache_health(self) -> HealthStatus:
         cache = await self.infra.cache()
         return await cache.health_check()
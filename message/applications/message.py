@@ -1,6 +1,24 @@
+# Standard Library
+import typing
+
 # Third Party Library
+from blinker import signal
 from message import models
 from message.applications.base import Application
+from message.common.constants import MESSAGE_SEND_BATCH_CHUNK_SIZE
+from message.common.constants import MESSAGE_STATUS_CHANNEL
+from message.common.constants import SIGNALS
+from message.common.constants import MessageStatusEnum
+from message.exceptions.message import MessageSendRequiredReceiversError
+from message.exceptions.provider import ProviderNotFoundError
+from message.helpers.decorators import ensure_infra
+from message.helpers.transactions import in_transaction
+from message.infra import get_infra
+from pypika import Table
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.timezone import now
+
+message_create_batch_signal = signal(SIGNALS.MESSAGE_CREATE_BATCH)
 
 
 class MessageApplication(Application[models.Message]):
@@ -10,3 +28,179 @@ class MessageApplication(Application[models.Message]):
 
     # required by Application
     model_class = models.Message
+
+    @ensure_infra("persistence")
+    async def send_messages(
+        self,
+        messages: typing.List[dict],
+        chunk_size: int = MESSAGE_SEND_BATCH_CHUNK_SIZE,
+    ) -> typing.List[int]:
+        """
+        Create many messages at once and enqueue them for delivery.
+
+        Each item of `messages` accepts `provider_id`, `content`, `users`,
+        `endpoints` and `contacts`. Providers and receivers of all items are
+        resolved together, then every chunk of messages is inserted with one
+        statement per table and delivered by one background job.
+
+        Args:
+            messages (list[dict]): Messages to send.
+            chunk_size (int): Number of messages inserted and enqueued together.
+
+        Returns:
+            list[int]: Ids of created messages, in the same order as `messages`.
+
+        Raises:
+            ProviderNotFoundError: If any provider does not exist.
+            MessageSendRequiredReceiversError: If any message has no receivers.
+        """
+        if not messages:
+            return []
+
+        for message in messages:
+            if not (
+                message.get("users")
+                or message.get("endpoints")
+                or message.get("contacts")
+            ):
+                raise MessageSendRequiredReceiversError
+
+        provider_ids = {int(message["provider_id"]) for message in messages}
+        existed_provider_ids = set(
+            await models.Provider.active_objects.filter(
+                id__in=provider_ids
+            ).values_list("id", flat=True)
+        )
+        if missing := provider_ids - existed_provider_ids:
+            raise ProviderNotFoundError(context={"ids": sorted(missing)})
+
+        # drop receivers which are not existed, instead of failing whole batch
+        existed_user_ids = set(
+            await models.User.active_objects.filter(
+                id__in={int(u) for m in messages for u in m.get("users") or []}
+            ).values_list("id", flat=True)
+        )
+        existed_endpoint_ids = set(
+            await models.Endpoint.active_objects.filter(
+                id__in={int(e) for m in messages for e in m.get("endpoints") or []}
+            ).values_list("id", flat=True)
+        )
+
+        message_ids = []
+        for start in range(0, len(messages), chunk_size):
+            chunk = messages[start : start + chunk_size]
+            async with in_transaction() as connection:
+                ids = await self._allocate_ids(len(chunk), connection)
+                await self.model_class.bulk_create(
+                    [
+                        self.model_class(
+                            id=id,
+                            provider_id=int(message["provider_id"]),
+                            content=message.get("content"),
+                            contacts=message.get("contacts"),
+                        )
+                        for id, message in zip(ids, chunk)
+                    ],
+                    using_db=connection,
+                )
+                await self._bulk_link(
+                    "users",
+                    [
+                        (id, user_id)
+                        for id, message in zip(ids, chunk)
+                        for user_id in {int(u) for u in message.get("users") or []}
+                        if user_id in existed_user_ids
+                    ],
+                    connection,
+                )
+                await self._bulk_link(
+                    "endpoints",
+                    [
+                        (id, endpoint_id)
+                        for id, message in zip(ids, chunk)
+                        for endpoint_id in {
+                            int(e) for e in message.get("endpoints") or []
+                        }
+                        if endpoint_id in existed_endpoint_ids
+                    ],
+                    connection,
+                )
+
+            await message_create_batch_signal.send_async(self, message_ids=ids)
+            message_ids.extend(ids)
+
+        return message_ids
+
+    @ensure_infra("persistence")
+    async def update_status(
+        self,
+        message: models.Message,
+        status: MessageStatusEnum,
+        results: typing.Optional[typing.List[dict]] = None,
+    ) -> models.Message:
+        """
+        Transit status of a message and publish the change to its watchers.
+
+        Args:
+            message (Message): The message to update.
+            status (MessageStatusEnum): The new status.
+            results (list[dict], optional): Results of sending to each recipient.
+
+        Returns:
+            Message: The updated message.
+        """
+        status = MessageStatusEnum(status)
+        message.status = status
+        transition = {"status": status.value, "updated_at": now().isoformat()}
+        if results is not None:
+            transition["results"] = results
+        message.status_history = [*(message.status_history or []), transition]
+        await message.save(update_fields=["status", "status_history", "updated_at"])
+
+        distribution = await get_infra().distribution()
+        await distribution.publish(
+            MESSAGE_STATUS_CHANNEL.format(id=message.id),
+            {
+                "id": message.id,
+                "status": status.value,
+                "status_history": message.status_history,
+                "updated_at": message.updated_at.isoformat(),
+            },
+        )
+        return message
+
+    async def _allocate_ids(
+        self, count: int, connection: BaseDBAsyncClient
+    ) -> typing.List[int]:
+        """
+        Reserve ids from the table's sequence, because bulk insert does not
+        return generated primary keys.
+        """
+        _, rows = await connection.execute_query(
+            "SELECT nextval(pg_get_serial_sequence($1, 'id')) AS id "
+            "FROM generate_series(1, $2)",
+            [self.model_class._meta.db_table, count],
+        )
+        return [row["id"] for row in rows]
+
+    async def _bulk_link(
+        self,
+        field_name: str,
+        pairs: typing.List[typing.Tuple[int, int]],
+        connection: BaseDBAsyncClient,
+    ) -> None:
+        """
+        Insert (message id, related id) pairs into a many-to-many through table.
+        """
+        if not pairs:
+            return
+
+        field = self.model_class._meta.fields_map[field_name]
+        through_table = Table(field.through)
+        query = connection.query_class.into(through_table).columns(
+            through_table[field.backward_key],
+            through_table[field.forward_key],
+        )
+        for pair in pairs:
+            query = query.insert(*pair)
+        await connection.execute_query(str(query))
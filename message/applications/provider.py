@@ -1,6 +1,16 @@
+# Standard Library
+import typing
+
 # Third Party Library
 from message import models
 from message.applications.base import Application
+from message.applications.base import as_ids
+from message.applications.base import ids_of_filters
+from message.helpers.decorators import ensure_infra
+
+if typing.TYPE_CHECKING:
+    # Third Party Library
+    from message.providers.abc import ProviderBase
 
 
 class ProviderTemplateApplication(Application[models.ProviderTemplate]):
@@ -10,6 +20,7 @@ class ProviderTemplateApplication(Application[models.ProviderTemplate]):
 
     # required by Application
     model_class = models.ProviderTemplate
+    cache_enabled = True
 
 
 class ProviderApplication(Application[models.Provider]):
@@ -19,3 +30,61 @@ class ProviderApplication(Application[models.Provider]):
 
     # required by Application
     model_class = models.Provider
+    cache_enabled = True
+
+    @ensure_infra("persistence")
+    async def get_provider_instance(self, provider: models.Provider) -> "ProviderBase":
+        """
+        Get the cached instance of a provider, which reuses its connections
+        across sends.
+        """
+        # Third Party Library
+        from message.providers.pool import provider_instances
+
+        if not isinstance(provider.provider_template, models.ProviderTemplate):
+            await provider.fetch_related("provider_template")
+        return await provider_instances.get(provider)
+
+    @ensure_infra("persistence")
+    async def update(self, domain, **kwargs) -> models.Provider:
+        """
+        Update provider, and drop its cached instances of all processes.
+        """
+        # Third Party Library
+        from message.providers.pool import provider_instances
+
+        domain = await super().update(domain, **kwargs)
+        await provider_instances.invalidate(domain.id)
+        return domain
+
+    @ensure_infra("persistence")
+    async def delete(self, id) -> bool:
+        """
+        Delete providers by ids, and drop their cached instances of all
+        processes.
+        """
+        # Third Party Library
+        from message.providers.pool import provider_instances
+
+        ids = as_ids(id)
+        deleted = await super().delete(ids)
+        await provider_instances.invalidate(*ids)
+        return deleted
+
+    @ensure_infra("persistence")
+    async def delete_many(self, filters: dict) -> bool:
+        """
+        Delete providers by filters, and drop their cached instances of all
+        processes.
+        """
+        # Third Party Library
+        from message.providers.pool import provider_instances
+
+        if (ids := ids_of_filters(filters)) is None:
+            ids = await self.model_class.active_objects.filter(**filters).values_list(
+                "id", flat=True
+            )
+            filters = {"id__in": ids}
+        deleted = await super().delete_many(filters)
+        await provider_instances.invalidate(*ids)
+        return deleted
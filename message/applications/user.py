@@ -1,9 +1,17 @@
+# Standard Library
+import typing
+from collections import defaultdict
+
 # Third Party Library
 from message import models
 from message.applications.base import Application
+from message.exceptions.endpoint import EndpointContactRequiredError
+from message.exceptions.user import UserGotInvalidEndpointError
+from message.exceptions.user import UserMetadataWithWrongTypeError
 from message.helpers.decorators import ensure_infra
+from message.helpers.transactions import atomic
 from message.wiring import ApplicationContainer
-from tortoise.transactions import atomic
+from tortoise.timezone import now
 
 
 class UserApplication(Application[models.User]):
@@ -13,6 +21,9 @@ class UserApplication(Application[models.User]):
 
     model_class = models.User
 
+    # columns of existed users updated by `upsert_many` if given
+    UPSERT_FIELDS = ("metadata", "is_active")
+
     @ensure_infra("persistence")
     @atomic()
     async def create(self, **kwargs) -> models.User:
@@ -80,3 +91,127 @@ class UserApplication(Application[models.User]):
         return await self.model_class.active_objects.get_or_none(
             external_id=external_id
         )
+
+    @ensure_infra("persistence")
+    @atomic()
+    async def upsert_many(self, users: typing.List[dict]) -> typing.List[models.User]:
+        """
+        Create or update many users by external id at once.
+
+        Each item of `users` accepts `external_id`, `metadata`, `is_active` and
+        `endpoints`. Users are upserted by `INSERT ... ON CONFLICT` queries,
+        which keep columns of existed users not given or given as None, and
+        endpoints of users given `endpoints` are replaced by one delete and
+        one insert, whatever the number of users.
+
+        Args:
+            users (list[dict]): Users to create or update, the last item wins
+                if an external id is given more than once.
+
+        Returns:
+            list[User]: Upserted users, in the order of their first appearance.
+
+        Raises:
+            UserMetadataWithWrongTypeError: If metadata of any user is not a map.
+            EndpointContactRequiredError: If any endpoint has no existed contact.
+            UserGotInvalidEndpointError: If any endpoint value is invalid.
+        """
+        users_by_external_id: typing.Dict[str, dict] = {}
+        for user in users:
+            metadata = user.get("metadata")
+            if metadata is not None and not isinstance(metadata, dict):
+                raise UserMetadataWithWrongTypeError
+            users_by_external_id[str(user["external_id"])] = user
+        if not users_by_external_id:
+            return []
+
+        endpoints = await self.build_endpoints(users_by_external_id)
+
+        # only columns given by the caller are updated, so users are upserted
+        # by one query per combination of the given columns
+        groups: typing.Dict[typing.Tuple[str, ...], typing.List[dict]] = defaultdict(
+            list
+        )
+        for external_id, user in users_by_external_id.items():
+            fields = tuple(
+                field
+                for field in self.UPSERT_FIELDS
+                if user.get(field, None) is not None
+            )
+            groups[fields].append(
+                {
+                    "external_id": external_id,
+                    **{field: user[field] for field in fields},
+                }
+            )
+        for fields, group in groups.items():
+            await self.model_class.bulk_create(
+                [self.model_class(**user) for user in group],
+                on_conflict=["external_id"],
+                # revive users deleted before, because external id is unique
+                update_fields=[*fields, "is_deleted", "deleted_at", "updated_at"],
+            )
+        upserted = {
+            user.external_id: user
+            for user in await self.model_class.active_objects.filter(
+                external_id__in=list(users_by_external_id)
+            )
+        }
+
+        replaced = [
+            upserted[external_id].id
+            for external_id, user in users_by_external_id.items()
+            if user.get("endpoints") is not None
+        ]
+        if replaced:
+            await models.Endpoint.active_objects.filter(user_id__in=replaced).update(
+                is_deleted=True, deleted_at=now()
+            )
+            await models.Endpoint.bulk_create(
+                [
+                    models.Endpoint(
+                        user_id=upserted[external_id].id,
+                        contact_id=contact_id,
+                        value=value,
+                    )
+                    for external_id, contact_id, value in endpoints
+                ]
+            )
+        return [upserted[external_id] for external_id in users_by_external_id]
+
+    async def build_endpoints(
+        self, users_by_external_id: typing.Dict[str, dict]
+    ) -> typing.List[typing.Tuple[str, int, dict]]:
+        """
+        Validate endpoints of users, grouped by contacts which are fetched once.
+        """
+        endpoints_of_contacts = defaultdict(list)
+        for external_id, user in users_by_external_id.items():
+            for endpoint in user.get("endpoints") or []:
+                value = endpoint.get("value")
+                if isinstance(value, str):
+                    value = {"regex": value}
+                endpoints_of_contacts[int(endpoint["contact_id"])].append(
+                    (external_id, value)
+                )
+        if not endpoints_of_contacts:
+            return []
+
+        contacts = {
+            contact.id: contact
+            for contact in await models.Contact.active_objects.filter(
+                id__in=list(endpoints_of_contacts)
+            )
+        }
+        endpoints = []
+        for contact_id, contact_endpoints in endpoints_of_contacts.items():
+            if (contact := contacts.get(contact_id)) is None:
+                raise EndpointContactRequiredError
+            results = contact.validate_endpoint_values(
+                value for _, value in contact_endpoints
+            )
+            for (external_id, value), result in zip(contact_endpoints, results):
+                if not result.valid:
+                    raise UserGotInvalidEndpointError
+                endpoints.append((external_id, contact_id, value))
+        return endpoints
@@ -4,6 +4,52 @@ import enum
 QUEUE_NAME = "message"
 SETTINGS_YAML = "/app/message/settings.yaml"
 
+# how many messages are inserted and delivered together by a batch send
+MESSAGE_SEND_BATCH_CHUNK_SIZE = 500
+
+# distribution channel where status transitions of a message are published
+MESSAGE_STATUS_CHANNEL = "message_status#{id}"
+
+# seconds between health samples, and the limit of each health check
+HEALTH_SAMPLE_INTERVAL = 5
+HEALTH_CHECK_TIMEOUT = 3
+
+# seconds to trust a healthy infrastructure before checking it again, and to
+# fail fast after an infrastructure is found down
+INFRA_HEALTH_TTL = 5
+INFRA_CIRCUIT_COOLDOWN = 1
+
+# how many provider instances, with their live clients, are kept per process,
+# and where updated or deleted providers are published
+PROVIDER_INSTANCE_CACHE_SIZE = 128
+PROVIDER_INSTANCE_CHANNEL = "provider_instance"
+
+# seconds to wait before listening to invalidations again after a failure,
+# doubled for each failure in a row up to the max
+INVALIDATION_RETRY_DELAY = 1
+INVALIDATION_RETRY_MAX_DELAY = 60
+
+# how many compiled contact definitions are kept per process
+CONTACT_DEFINITION_CACHE_SIZE = 1024
+
+# how many endpoints are inserted together by an import, and how many errors
+# of an import are kept for its owner
+ENDPOINT_IMPORT_CHUNK_SIZE = 5000
+ENDPOINT_IMPORT_MAX_ERRORS = 100
+
+# read-through cache of applications: domains kept per process, seconds to
+# keep them in process and in redis, and where invalidations are published
+APPLICATION_CACHE_SIZE = 1024
+APPLICATION_CACHE_LOCAL_TTL = 30
+APPLICATION_CACHE_REDIS_TTL = 300
+APPLICATION_CACHE_KEY = "application_cache#{table}#{id}"
+APPLICATION_CACHE_CHANNEL = "application_cache#{table}"
+
+
+class SIGNALS:
+    MESSAGE_CREATE_BATCH = "message_create_batch"
+    ENDPOINT_IMPORT = "endpoint_import"
+
 
 class MessageStatusEnum(enum.Enum):
     PENDING = "pending"
@@ -11,3 +57,15 @@ class MessageStatusEnum(enum.Enum):
     SENDING = "sending"
     FAILED = "failed"
     SUCCEEDED = "succeeded"
+
+
+class EndpointImportFormatEnum(enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class EndpointImportStatusEnum(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    SUCCEEDED = "succeeded"
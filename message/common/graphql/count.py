@@ -0,0 +1,100 @@
+# Standard Library
+import enum
+import hashlib
+
+# Third Party Library
+import orjson
+from message.infra import get_infra
+from tortoise.queryset import QuerySet
+
+__all__ = [
+    "CountStrategy",
+    "count_queryset",
+]
+
+# estimations below this are not reliable enough, count them exactly instead.
+ESTIMATED_COUNT_THRESHOLD = 10000
+CACHED_COUNT_KEY = "connection_count#{table}#{digest}"
+
+
+class CountStrategy(enum.Enum):
+    """
+    How connections count the total quantity of items.
+
+    - EXACT: run `count()` on each request.
+    - ESTIMATED: use the row estimation of postgres planner, which comes from
+      `pg_class.reltuples` and table statistics, no scan is needed.
+    - CACHED: run `count()` once and cache it in redis for a while, keyed by
+      the normalized filters of the queryset.
+    """
+
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    CACHED = "cached"
+
+
+async def count_exactly(queryset: QuerySet) -> int:
+    return await queryset.count()
+
+
+async def count_by_estimation(queryset: QuerySet) -> int:
+    try:
+        rows = await queryset.explain()
+        plan = rows[0]["QUERY PLAN"]
+        if isinstance(plan, (str, bytes)):
+            plan = orjson.loads(plan)
+        estimated = int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        # not postgres or statistics are not ready
+        return await count_exactly(queryset)
+
+    if estimated < ESTIMATED_COUNT_THRESHOLD:
+        return await count_exactly(queryset)
+    return estimated
+
+
+async def count_by_cache(queryset: QuerySet, ttl: int) -> int:
+    count_query = queryset.count()
+    # filters of count query are rendered in a stable order, so the sql itself
+    # is a normalized form of the filter set
+    digest = hashlib.sha1(count_query.sql().encode()).hexdigest()
+    key = CACHED_COUNT_KEY.format(table=queryset.model._meta.db_table, digest=digest)
+
+    try:
+        cache = await get_infra().cache()
+        if (cached := await cache.redis.get(key)) is not None:
+            return int(cached)
+    except Exception:
+        return await count_query
+
+    count = await count_query
+    try:
+        await cache.redis.set(key, count, ex=ttl)
+    except Exception:
+        pass
+    return count
+
+
+async def count_queryset(
+    queryset: QuerySet,
+    strategy: CountStrategy = CountStrategy.EXACT,
+    ttl: int = 30,
+) -> int:
+    """
+    Count queryset in the given strategy.
+
+    Args:
+        queryset (QuerySet): Queryset with all filters applied.
+        strategy (CountStrategy): How to count.
+        ttl (int): Seconds to keep the count, only used by CACHED strategy.
+
+    Returns:
+        int: Total quantity of items.
+    """
+    match CountStrategy(strategy):
+        case CountStrategy.ESTIMATED:
+            return await count_by_estimation(queryset)
+        case CountStrategy.CACHED:
+            return await count_by_cache(queryset, ttl)
+        case _:
+            return await count_exactly(queryset)
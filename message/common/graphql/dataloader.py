@@ -0,0 +1,75 @@
+# Standard Library
+import functools
+import typing
+
+# Third Party Library
+from strawberry.dataloader import DataLoader
+from strawberry.types.info import Info
+from tortoise import Model
+
+__all__ = [
+    "TortoiseDataLoaderRegistry",
+    "get_dataloaders",
+]
+
+
+async def load_models(
+    model: typing.Type[Model], ids: typing.List[typing.Any]
+) -> typing.List[typing.Optional[Model]]:
+    """
+    Load models by ids in a single `id__in` query.
+
+    Results are ordered as `ids`, missing ones are None.
+    """
+    manager = getattr(model, "active_objects", model)
+    found = {instance.pk: instance for instance in await manager.filter(id__in=ids)}
+    return [found.get(id) for id in ids]
+
+
+class TortoiseDataLoaderRegistry:
+    """
+    Per-request registry of dataloaders for tortoise orm models.
+
+    Loaders are keyed by model, so every lookup of the same model within one
+    execution tick is coalesced into one query, and lookups for the same id
+    are served from the request scoped cache.
+
+    >>> loaders = TortoiseDataLoaderRegistry()
+    >>> user = await loaders.get_loader(models.User).load(1)
+    """
+
+    def __init__(self) -> None:
+        self._loaders: typing.Dict[
+            typing.Tuple[typing.Type[Model], str], DataLoader
+        ] = {}
+
+    def get_loader(self, model: typing.Type[Model]) -> DataLoader:
+        """
+        Get the loader which loads models by primary key.
+        """
+        key = (model, "id")
+        if key not in self._loaders:
+            self._loaders[key] = DataLoader(
+                load_fn=functools.partial(load_models, model)
+            )
+        return self._loaders[key]
+
+
+def get_dataloaders(info: Info) -> TortoiseDataLoaderRegistry:
+    """
+    Get the dataloader registry of current request.
+
+    Falls back to a fresh registry when the context does not carry one,
+    e.g. schema executed directly in tests.
+    """
+    context = info.context
+    if context is None:
+        return TortoiseDataLoaderRegistry()
+    if isinstance(context, dict):
+        return context.setdefault("dataloaders", TortoiseDataLoaderRegistry())
+
+    loaders = getattr(context, "dataloaders", None)
+    if loaders is None:
+        loaders = TortoiseDataLoaderRegistry()
+        setattr(context, "dataloaders", loaders)
+    return loaders
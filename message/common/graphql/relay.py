@@ -1,14 +1,24 @@
 # Standard Library
 import dataclasses
 import datetime
+import enum
 import inspect
 import math
+import operator
 import typing
+from inspect import isclass
 
 # Third Party Library
 import strawberry
+from graphql import GraphQLError
 from message.common.graphql.converter import convert_python_type_to_pure_python_type
+from message.common.graphql.count import CountStrategy
+from message.common.graphql.count import count_queryset
+from message.common.graphql.dataloader import get_dataloaders
 from message.common.graphql.scalar import ULID
+from message.common.graphql.selection import NodeSelection
+from message.common.graphql.selection import fetch_selection
+from message.common.graphql.selection import get_node_selection
 from strawberry.annotation import StrawberryAnnotation
 from strawberry.arguments import StrawberryArgument
 from strawberry.field import StrawberryField
@@ -16,8 +26,11 @@ from strawberry.relay import Connection
 from strawberry.relay import Node
 from strawberry.relay import NodeID
 from strawberry.relay import NodeType
+from strawberry.relay import PageInfo
 from strawberry.relay.exceptions import RelayWrongAnnotationError
 from strawberry.relay.exceptions import RelayWrongResolverAnnotationError
+from strawberry.relay.types import PREFIX as CURSOR_PREFIX
+from strawberry.relay.utils import from_base64
 from strawberry.type import StrawberryContainer
 from strawberry.type import get_object_definition
 from strawberry.types.info import Info
@@ -26,6 +39,9 @@ from strawberry.utils.typing import eval_type
 from tortoise import Model
 from tortoise.contrib.pydantic.creator import pydantic_model_creator
 from tortoise.contrib.pydantic.creator import pydantic_queryset_creator
+from tortoise.expressions import Q
+from tortoise.fields.data import CharEnumFieldInstance
+from tortoise.fields.data import IntEnumFieldInstance
 from tortoise.queryset import QuerySet
 
 
@@ -54,6 +70,24 @@ class MetaOptions:
         return cls(model, abstract=abstract, interfaces=interfaces)
 
 
+def enum_to_value(value: typing.Any) -> typing.Any:
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def build_node_converters(
+    tortoise_model: typing.Type[Model], node_fields: typing.Tuple[str, ...]
+) -> typing.Tuple[typing.Tuple[str, typing.Callable], ...]:
+    """
+    Build converters of node fields whose orm value is not the node value.
+    """
+    converters = []
+    for name in node_fields:
+        field = tortoise_model._meta.fields_map.get(name)
+        if isinstance(field, (CharEnumFieldInstance, IntEnumFieldInstance)):
+            converters.append((name, enum_to_value))
+    return tuple(converters)
+
+
 class TortoiseORMModelNodeMetaclass(type):
     def get_meta_from_bases(self, bases):
         for base in bases:
@@ -91,6 +125,14 @@ class TortoiseORMModelNodeMetaclass(type):
         attrs["__pydantic_queryset_model__"] = pydantic_queryset_model
         attrs["__annotations__"] = pure_python_type.__annotations__
         attrs["__annotations__"]["id"] = NodeID[int]
+        # NOTE: nodes are built from orm models or value rows directly, pydantic
+        # validation is skipped and only the conversion it did is kept.
+        node_fields = tuple(pydantic_model.model_fields)
+        attrs["__node_fields__"] = node_fields
+        attrs["__node_getter__"] = operator.attrgetter(*node_fields)
+        attrs["__node_converters__"] = build_node_converters(
+            tortoise_model, node_fields
+        )
 
         subcls = super().__new__(cls, name, bases, attrs)
         return strawberry.type(description="An relay node for tortoise orm model")(
@@ -104,16 +146,56 @@ class _DefaultTortoiseNode(Node):
     def resolve_nodes(
         cls, *, info: Info, node_ids: typing.Iterable[ULID], required: bool = False
     ):
-        # TODO: use proper dataloader from info["context"] instead
+        loader = get_dataloaders(info).get_loader(cls.__tortoise_model__)
+
         async def resolver():
-            qs = cls.__tortoise_model__.active_objects.filter(id__in=list(node_ids))
-            qs_model = await cls.__pydantic_queryset_model__.from_queryset(qs)
-            if qs_model.root:
-                return [cls(**model.model_dump()) for model in qs_model.root]
-            raise Exception(f"{cls.__tortoise_model__.__name__} not found")
+            orms = await loader.load_many([int(node_id) for node_id in node_ids])
+            if required and any(orm is None for orm in orms):
+                raise Exception(f"{cls.__tortoise_model__.__name__} not found")
+            return [cls.from_orm(orm) if orm is not None else None for orm in orms]
 
         return resolver()
 
+    @classmethod
+    def from_orm(cls, orm: Model) -> typing.Self:
+        """
+        Build node from a fetched tortoise orm model.
+
+        Fields not fetched by `QuerySet.only()` are left None.
+        """
+        if orm._partial:
+            kwargs = {name: getattr(orm, name, None) for name in cls.__node_fields__}
+        else:
+            kwargs = dict(zip(cls.__node_fields__, cls.__node_getter__(orm)))
+        for name, convert in cls.__node_converters__:
+            kwargs[name] = convert(kwargs[name])
+        return cls(**kwargs)
+
+    @classmethod
+    def from_values(cls, row: typing.Dict[str, typing.Any]) -> typing.Self:
+        """
+        Build node from a row of `QuerySet.values()`.
+
+        Columns not in the row are left None, they are supposed to be not
+        selected by the query.
+        """
+        kwargs = {name: row.get(name) for name in cls.__node_fields__}
+        for name, convert in cls.__node_converters__:
+            kwargs[name] = convert(kwargs[name])
+        return cls(**kwargs)
+
+    def replace(self, **changes) -> typing.Self:
+        """
+        Build a new node with some fields changed, without touching database.
+        """
+        kwargs = {name: getattr(self, name) for name in self.__node_fields__}
+        kwargs.update(
+            (name, value)
+            for name, value in changes.items()
+            if name in self.__node_fields__
+        )
+        return self.__class__(**kwargs)
+
 
 class TortoiseORMNode(metaclass=TortoiseORMModelNodeMetaclass):
     @classmethod
@@ -164,10 +246,9 @@ class TortoiseORMPaginationConnection(Connection[NodeType]):
 
 
         """
-        # TODO: get field type and resolve model as field type
-        return node_type(
-            **node_type.__pydantic_model__.model_validate(node).model_dump()
-        )
+        if isinstance(node, dict):
+            return node_type.from_values(node)
+        return node_type.from_orm(node)
 
     @classmethod
     def resolve_connection(
@@ -181,6 +262,8 @@ class TortoiseORMPaginationConnection(Connection[NodeType]):
         created_at_after: typing.Optional[datetime.datetime] = None,
         updated_at_before: typing.Optional[datetime.datetime] = None,
         updated_at_after: typing.Optional[datetime.datetime] = None,
+        count_strategy: CountStrategy = CountStrategy.EXACT,
+        count_cache_ttl: int = 30,
         **kwargs,
     ) -> AwaitableOrValue[typing.Self]:
         """Resolve a connection from the list of nodes.
@@ -200,6 +283,10 @@ class TortoiseORMPaginationConnection(Connection[NodeType]):
                 Filter nodes updated before this time
             updated_at_after:
                 Filter nodes updated after this time
+            count_strategy:
+                How to count the total quantity of nodes
+            count_cache_ttl:
+                Seconds to cache the total, used by cached count strategy
 
         """
         default_page_size = info.schema.config.relay_default_page_size
@@ -219,45 +306,33 @@ class TortoiseORMPaginationConnection(Connection[NodeType]):
         else:
             page_size = default_page_size
 
-        type_def = get_object_definition(cls)
-        node_type = type_def.type_var_map["NodeType"]
-        assert type_def
-        field_def = type_def.get_field("edges")
-        assert field_def
-        field = field_def.resolve_type(type_definition=type_def)
-        while isinstance(field, StrawberryContainer):
-            field = field.of_type
-
-        edge_class = typing.cast(strawberry.relay.Edge[NodeType], field)
-
-        common_filter = {}
-        if created_at_before:
-            common_filter["created_at__lt"] = created_at_before
-        if created_at_after:
-            common_filter["created_at__gt"] = created_at_after
-        if updated_at_before:
-            common_filter["updated_at__lt"] = updated_at_before
-        if updated_at_after:
-            common_filter["updated_at__gt"] = updated_at_after
+        node_type = get_object_definition(cls).type_var_map["NodeType"]
+        edge_class = get_edge_class(cls)
+        # only fetch what is selected by `edges { node { ... } }`
+        selection = get_node_selection(info, node_type, "edges", "node")
+        common_filter = build_common_filter(
+            created_at_before=created_at_before,
+            created_at_after=created_at_after,
+            updated_at_before=updated_at_before,
+            updated_at_after=updated_at_after,
+        )
 
         async def resolver(nodes: QuerySet[Model]):
-            item_total = await nodes.count()
+            nodes = nodes.filter(**common_filter)
+            item_total = await count_queryset(nodes, count_strategy, count_cache_ttl)
             page_total = math.ceil(item_total / page_size)
 
             limit = page_size
             offset = (page - 1) * page_size
 
-            # TODO: use dataloader to optimize problems about fetching related
-            nodes = nodes.filter(**common_filter)
             nodes = nodes.limit(limit).offset(offset).order_by("-created_at")
+            rows = await fetch_selection(nodes, selection)
             edges: typing.List[strawberry.relay.Edge] = [
                 edge_class.resolve_edge(
-                    cls.resolve_node(node, info=info, node_type=node_type, **kwargs),
-                    cursor=str(node.id),
+                    cls.resolve_node(row, info=info, node_type=node_type, **kwargs),
+                    cursor=str(row["id"] if isinstance(row, dict) else row.id),
                 )
-                for node in (
-                    await node_type.__pydantic_queryset_model__.from_queryset(nodes)
-                ).root
+                for row in rows
             ]
 
             return cls(
@@ -273,59 +348,302 @@ class TortoiseORMPaginationConnection(Connection[NodeType]):
         return resolver(nodes)
 
 
-# TODO: TortoiseORMCursorConnection(Connection[NodeType])
+@strawberry.type(description="A connection to a list of objects by keyset")
+class TortoiseORMCursorConnection(Connection[NodeType]):
+    """
+    Keyset pagination on `(created_at, id)`.
+
+    Unlike offset pagination, fetching a deep page costs the same as the first
+    one, because rows are located by the index instead of being skipped.
+    """
+
+    nodes: strawberry.Private[typing.Optional[QuerySet]] = None
+    count_strategy: strawberry.Private[CountStrategy] = CountStrategy.EXACT
+    count_cache_ttl: strawberry.Private[int] = 30
+
+    @strawberry.field(description="Total quantity of items, counted only if queried")
+    async def total_count(self) -> int:
+        return await count_queryset(
+            self.nodes, self.count_strategy, self.count_cache_ttl
+        )
+
+    @classmethod
+    def encode_cursor(
+        cls, row: typing.Union[Model, typing.Dict[str, typing.Any]]
+    ) -> str:
+        if not isinstance(row, dict):
+            row = {"created_at": row.created_at, "id": row.id}
+        # NOTE: edge will make it opaque by encoding it with base64
+        return f"{row['created_at'].isoformat()}|{row['id']}"
+
+    @classmethod
+    def decode_cursor(cls, cursor: str) -> typing.Tuple[datetime.datetime, int]:
+        try:
+            prefix, value = from_base64(cursor)
+            created_at, id = value.split("|")
+            if prefix == CURSOR_PREFIX:
+                return datetime.datetime.fromisoformat(created_at), int(id)
+        except ValueError:
+            pass
+        raise invalid_argument(f"Argument cursor '{cursor}' is invalid.")
+
+    @classmethod
+    def resolve_node(
+        cls,
+        node: Model,
+        *,
+        info: Info,
+        node_type: typing.Type[NodeType],
+        **kwargs: typing.Any,
+    ) -> NodeType:
+        if isinstance(node, dict):
+            return node_type.from_values(node)
+        return node_type.from_orm(node)
+
+    @classmethod
+    def resolve_connection(
+        cls,
+        nodes: QuerySet[Model],
+        *,
+        info: Info,
+        before: typing.Optional[str] = None,
+        after: typing.Optional[str] = None,
+        first: typing.Optional[int] = None,
+        last: typing.Optional[int] = None,
+        created_at_before: typing.Optional[datetime.datetime] = None,
+        created_at_after: typing.Optional[datetime.datetime] = None,
+        updated_at_before: typing.Optional[datetime.datetime] = None,
+        updated_at_after: typing.Optional[datetime.datetime] = None,
+        count_strategy: CountStrategy = CountStrategy.EXACT,
+        count_cache_ttl: int = 30,
+        **kwargs,
+    ) -> AwaitableOrValue[typing.Self]:
+        """Resolve a connection from the list of nodes by keyset.
+
+        Nodes are ordered by `created_at` and `id` descendingly, cursors
+        encode both of them so that the next page starts right after the
+        last node of current page.
+
+        Args:
+            info:
+                The strawberry execution info resolve the type name from
+            nodes:
+                A queryset of nodes to paginate
+            before:
+                Returns the items in the list that come before the specified cursor
+            after:
+                Returns the items in the list that come after the specified cursor
+            first:
+                Returns the first n items from the list
+            last:
+                Returns the items in the list that come after the specified cursor
+            created_at_before:
+                Filter nodes created before this time
+            created_at_after:
+                Filter nodes created after this time
+            updated_at_before:
+                Filter nodes updated before this time
+            updated_at_after:
+                Filter nodes updated after this time
+            count_strategy:
+                How to count the total quantity of nodes
+            count_cache_ttl:
+                Seconds to cache the total, used by cached count strategy
+
+        """
+        default_page_size = info.schema.config.relay_default_page_size
+        max_results = info.schema.config.relay_max_results
+        for name, value in (("first", first), ("last", last)):
+            if value is not None and value < 0:
+                raise invalid_argument(
+                    f"Argument '{name}' must be a non-negative integer."
+                )
+        if first is not None and last is not None:
+            raise invalid_argument(
+                "Argument 'first' and 'last' can not be used together."
+            )
+
+        backward = last is not None
+        if backward:
+            page_size = min(last, max_results)
+        else:
+            page_size = min(default_page_size if first is None else first, max_results)
+
+        node_type = get_object_definition(cls).type_var_map["NodeType"]
+        edge_class = get_edge_class(cls)
+        # only fetch what is selected by `edges { node { ... } }`
+        selection = get_node_selection(info, node_type, "edges", "node")
+        nodes = nodes.filter(
+            **build_common_filter(
+                created_at_before=created_at_before,
+                created_at_after=created_at_after,
+                updated_at_before=updated_at_before,
+                updated_at_after=updated_at_after,
+            )
+        )
+
+        def newer_than(cursor: str, inclusive: bool = False) -> Q:
+            created_at, id = cls.decode_cursor(cursor)
+            id_lookup = "id__gte" if inclusive else "id__gt"
+            return Q(created_at__gt=created_at) | Q(
+                created_at=created_at, **{id_lookup: id}
+            )
+
+        def older_than(cursor: str, inclusive: bool = False) -> Q:
+            created_at, id = cls.decode_cursor(cursor)
+            id_lookup = "id__lte" if inclusive else "id__lt"
+            return Q(created_at__lt=created_at) | Q(
+                created_at=created_at, **{id_lookup: id}
+            )
+
+        if not selection.selected:
+            # cursors of page info are still needed
+            selection = NodeSelection(columns=("id", "created_at"))
+
+        async def resolver(nodes: QuerySet[Model]):
+            page = nodes
+            if after:
+                page = page.filter(older_than(after))
+            if before:
+                page = page.filter(newer_than(before))
+
+            # fetch one more row to know whether there are more in this direction
+            if backward:
+                page = page.order_by("created_at", "id").limit(page_size + 1)
+                rows = await fetch_selection(page, selection)
+                has_more, rows = len(rows) > page_size, rows[:page_size][::-1]
+            else:
+                page = page.order_by("-created_at", "-id").limit(page_size + 1)
+                rows = await fetch_selection(page, selection)
+                has_more, rows = len(rows) > page_size, rows[:page_size]
+
+            # the opposite direction only needs to know whether any row exists
+            if backward:
+                has_previous_page = has_more
+                has_next_page = (
+                    bool(before)
+                    and await nodes.filter(older_than(before, inclusive=True)).exists()
+                )
+            else:
+                has_next_page = has_more
+                has_previous_page = (
+                    bool(after)
+                    and await nodes.filter(newer_than(after, inclusive=True)).exists()
+                )
+
+            edges: typing.List[strawberry.relay.Edge] = [
+                edge_class.resolve_edge(
+                    cls.resolve_node(row, info=info, node_type=node_type, **kwargs),
+                    cursor=cls.encode_cursor(row),
+                )
+                for row in rows
+            ]
+
+            return cls(
+                edges=edges,
+                page_info=PageInfo(
+                    has_next_page=has_next_page,
+                    has_previous_page=has_previous_page,
+                    start_cursor=edges[0].cursor if edges else None,
+                    end_cursor=edges[-1].cursor if edges else None,
+                ),
+                nodes=nodes,
+                count_strategy=count_strategy,
+                count_cache_ttl=count_cache_ttl,
+            )
+
+        return resolver(nodes)
+
+
+def invalid_argument(message: str) -> GraphQLError:
+    """
+    Build an error of arguments given by client, reported in `errors` of the
+    response with code `BAD_USER_INPUT`.
+    """
+    return GraphQLError(message, extensions={"code": "BAD_USER_INPUT"})
+
+
+def get_edge_class(connection_cls) -> typing.Type[strawberry.relay.Edge]:
+    """
+    Get the edge type of a specialized connection type.
+    """
+    type_def = get_object_definition(connection_cls)
+    assert type_def
+    field_def = type_def.get_field("edges")
+    assert field_def
+    field = field_def.resolve_type(type_definition=type_def)
+    while isinstance(field, StrawberryContainer):
+        field = field.of_type
+    return typing.cast(strawberry.relay.Edge[NodeType], field)
+
+
+def build_common_filter(
+    created_at_before: typing.Optional[datetime.datetime] = None,
+    created_at_after: typing.Optional[datetime.datetime] = None,
+    updated_at_before: typing.Optional[datetime.datetime] = None,
+    updated_at_after: typing.Optional[datetime.datetime] = None,
+) -> typing.Dict[str, datetime.datetime]:
+    """
+    Build filters shared by all tortoise orm connections.
+    """
+    common_filter = {}
+    if created_at_before:
+        common_filter["created_at__lt"] = created_at_before
+    if created_at_after:
+        common_filter["created_at__gt"] = created_at_after
+    if updated_at_before:
+        common_filter["updated_at__lt"] = updated_at_before
+    if updated_at_after:
+        common_filter["updated_at__gt"] = updated_at_after
+    return common_filter
+
+
+def build_argument(
+    python_name: str, type_: typing.Any, default: typing.Any = None
+) -> StrawberryArgument:
+    return StrawberryArgument(
+        python_name=python_name,
+        graphql_name=None,
+        type_annotation=StrawberryAnnotation(type_),
+        default=default,
+    )
+
+
 class TortoiseORMPaginationConnectionExtension(
     strawberry.relay.fields.ConnectionExtension
 ):
-    def apply(self, field: StrawberryField) -> None:
-        field.arguments = [
-            *field.arguments,
-            StrawberryArgument(
-                python_name="page",
-                graphql_name=None,
-                type_annotation=StrawberryAnnotation(typing.Optional[int]),
-                default=1,
-            ),
-            StrawberryArgument(
-                python_name="page_size",
-                graphql_name=None,
-                type_annotation=StrawberryAnnotation(typing.Optional[int]),
-                default=10,
-            ),
-            StrawberryArgument(
-                python_name="created_at_before",
-                graphql_name=None,
-                type_annotation=StrawberryAnnotation(
-                    typing.Optional[datetime.datetime]
-                ),
-                default=None,
-            ),
-            StrawberryArgument(
-                python_name="created_at_after",
-                graphql_name=None,
-                type_annotation=StrawberryAnnotation(
-                    typing.Optional[datetime.datetime]
-                ),
-                default=None,
-            ),
-            StrawberryArgument(
-                python_name="updated_at_before",
-                graphql_name=None,
-                type_annotation=StrawberryAnnotation(
-                    typing.Optional[datetime.datetime]
-                ),
-                default=None,
-            ),
-            StrawberryArgument(
-                python_name="updated_at_after",
-                graphql_name=None,
-                type_annotation=StrawberryAnnotation(
-                    typing.Optional[datetime.datetime]
-                ),
-                default=None,
-            ),
+    def __init__(
+        self,
+        count_strategy: CountStrategy = CountStrategy.EXACT,
+        count_cache_ttl: int = 30,
+    ) -> None:
+        super().__init__()
+        self.count_strategy = CountStrategy(count_strategy)
+        self.count_cache_ttl = count_cache_ttl
+
+    def get_arguments(self) -> typing.List[StrawberryArgument]:
+        """
+        Arguments added to the connection field, which are passed to
+        `resolve_connection` instead of the field resolver.
+        """
+        return [
+            build_argument("page", typing.Optional[int], 1),
+            build_argument("page_size", typing.Optional[int], 10),
+            *self.get_filter_arguments(),
+        ]
+
+    def get_filter_arguments(self) -> typing.List[StrawberryArgument]:
+        return [
+            build_argument("created_at_before", typing.Optional[datetime.datetime]),
+            build_argument("created_at_after", typing.Optional[datetime.datetime]),
+            build_argument("updated_at_before", typing.Optional[datetime.datetime]),
+            build_argument("updated_at_after", typing.Optional[datetime.datetime]),
         ]
 
+    def apply(self, field: StrawberryField) -> None:
+        self.connection_arguments = self.get_arguments()
+        field.arguments = [*field.arguments, *self.connection_arguments]
+
         f_type = field.type
         if not isinstance(f_type, type) or not issubclass(f_type, Connection):
             raise RelayWrongAnnotationError(field.name, typing.cast(type, field.origin))
@@ -360,26 +678,32 @@ class TortoiseORMPaginationConnectionExtension(
 
         self.connection_type = typing.cast(typing.Type[Connection[Node]], field.type)
 
+    def split_kwargs(
+        self, kwargs: typing.Dict[str, typing.Any]
+    ) -> typing.Tuple[typing.Dict[str, typing.Any], typing.Dict[str, typing.Any]]:
+        """
+        Split kwargs into ones of connection and ones of field resolver.
+        """
+        names = {argument.python_name for argument in self.connection_arguments}
+        connection_kwargs = {k: v for k, v in kwargs.items() if k in names}
+        resolver_kwargs = {k: v for k, v in kwargs.items() if k not in names}
+        return connection_kwargs, resolver_kwargs
+
     def resolve(
         self,
         next_,
         source: typing.Any,
         info: Info,
-        *,
-        created_at_before: typing.Optional[datetime.datetime] = None,
-        created_at_after: typing.Optional[datetime.datetime] = None,
-        updated_at_before: typing.Optional[datetime.datetime] = None,
-        updated_at_after: typing.Optional[datetime.datetime] = None,
         **kwargs: typing.Any,
     ) -> typing.Any:
         assert self.connection_type is not None
+        connection_kwargs, kwargs = self.split_kwargs(kwargs)
         return self.connection_type.resolve_connection(
             typing.cast(typing.Iterable[Node], next_(source, info, **kwargs)),
             info=info,
-            created_at_before=created_at_before,
-            created_at_after=created_at_after,
-            updated_at_before=updated_at_before,
-            updated_at_after=updated_at_after,
+            count_strategy=self.count_strategy,
+            count_cache_ttl=self.count_cache_ttl,
+            **connection_kwargs,
         )
 
     async def resolve_async(
@@ -387,16 +711,10 @@ class TortoiseORMPaginationConnectionExtension(
         next_,
         source: typing.Any,
         info: Info,
-        *,
-        page: typing.Optional[int] = 1,
-        page_size: typing.Optional[int] = 10,
-        created_at_before: typing.Optional[datetime.datetime] = None,
-        created_at_after: typing.Optional[datetime.datetime] = None,
-        updated_at_before: typing.Optional[datetime.datetime] = None,
-        updated_at_after: typing.Optional[datetime.datetime] = None,
         **kwargs: typing.Any,
     ) -> typing.Any:
         assert self.connection_type is not None
+        connection_kwargs, kwargs = self.split_kwargs(kwargs)
         nodes = next_(source, info, **kwargs)
         # nodes might be an AsyncIterable/AsyncIterator
         # In this case we don't await for it
@@ -406,12 +724,9 @@ class TortoiseORMPaginationConnectionExtension(
         resolved = self.connection_type.resolve_connection(
             typing.cast(typing.Iterable[Node], nodes),
             info=info,
-            page=page,
-            page_size=page_size,
-            created_at_before=created_at_before,
-            created_at_after=created_at_after,
-            updated_at_before=updated_at_before,
-            updated_at_after=updated_at_after,
+            count_strategy=self.count_strategy,
+            count_cache_ttl=self.count_cache_ttl,
+            **connection_kwargs,
         )
 
         # If nodes was an AsyncIterable/AsyncIterator, resolve_connection
@@ -421,6 +736,17 @@ class TortoiseORMPaginationConnectionExtension(
         return resolved
 
 
+class TortoiseORMCursorConnectionExtension(TortoiseORMPaginationConnectionExtension):
+    def get_arguments(self) -> typing.List[StrawberryArgument]:
+        return [
+            build_argument("before", typing.Optional[str]),
+            build_argument("after", typing.Optional[str]),
+            build_argument("first", typing.Optional[int]),
+            build_argument("last", typing.Optional[int]),
+            *self.get_filter_arguments(),
+        ]
+
+
 def connection(
     graphql_type=None,
     *,
@@ -439,7 +765,23 @@ def connection(
     # is added in the constructor or not. It is not used to change
     # any behavior at the moment.
     init=None,
+    count_strategy: CountStrategy = CountStrategy.EXACT,
+    count_cache_ttl: int = 30,
 ):
+    """
+    Create a connection field for tortoise orm models.
+
+    `count_strategy` decides how the total quantity of nodes is counted, see
+    `CountStrategy`. `count_cache_ttl` is only used by the cached strategy.
+    """
+    connection_type = typing.get_origin(graphql_type) or graphql_type
+    if isclass(connection_type) and issubclass(
+        connection_type, TortoiseORMCursorConnection
+    ):
+        extension_class = TortoiseORMCursorConnectionExtension
+    else:
+        extension_class = TortoiseORMPaginationConnectionExtension
+
     f = StrawberryField(
         python_name=None,
         graphql_name=name,
@@ -452,7 +794,7 @@ def connection(
         default_factory=default_factory,
         metadata=metadata,
         directives=directives or (),
-        extensions=[*extensions, TortoiseORMPaginationConnectionExtension()],
+        extensions=[*extensions, extension_class(count_strategy, count_cache_ttl)],
     )
     if resolver is not None:
         f = f(resolver)
@@ -0,0 +1,151 @@
+# Standard Library
+import typing
+
+# Third Party Library
+from strawberry.type import get_object_definition
+from strawberry.types.info import Info
+from strawberry.types.nodes import FragmentSpread
+from strawberry.types.nodes import InlineFragment
+from strawberry.types.nodes import SelectedField
+from strawberry.types.nodes import Selection
+from tortoise import Model
+from tortoise.queryset import QuerySet
+
+__all__ = [
+    "NodeSelection",
+    "get_node_selection",
+    "fetch_selection",
+]
+
+
+class NodeSelection(typing.NamedTuple):
+    """
+    What a query selects of a tortoise orm node.
+
+    Attributes:
+        selected: Whether the node is selected at all.
+        columns: Python names of selected columns, None means every column.
+        relations: Selected relations in `prefetch_related` form, e.g.
+            ("provider", "users__endpoints").
+    """
+
+    selected: bool = True
+    columns: typing.Optional[typing.Tuple[str, ...]] = None
+    relations: typing.Tuple[str, ...] = ()
+
+
+def iter_selected_fields(
+    selections: typing.Iterable[Selection],
+) -> typing.Iterator[SelectedField]:
+    """
+    Iterate selected fields, fragments are flattened.
+    """
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            yield selection
+        elif isinstance(selection, (InlineFragment, FragmentSpread)):
+            yield from iter_selected_fields(selection.selections)
+
+
+def find_selected_field(
+    selections: typing.Iterable[Selection], *path: str
+) -> typing.Optional[SelectedField]:
+    """
+    Find the selected field by path of graphql names, e.g. ("edges", "node").
+    """
+    name, *rest = path
+    for selected in iter_selected_fields(selections):
+        if selected.name == name:
+            if not rest:
+                return selected
+            return find_selected_field(selected.selections, *rest)
+    return None
+
+
+def collect_relations(
+    model: typing.Type[Model], selected: SelectedField, name_converter
+) -> typing.Iterator[str]:
+    """
+    Collect relations of model selected by field, nested ones are joined by `__`.
+    """
+    graphql_names = {
+        name_converter.apply_naming_config(name): name
+        for name in model._meta.fetch_fields
+    }
+    for field in iter_selected_fields(selected.selections):
+        if (relation := graphql_names.get(field.name)) is None:
+            continue
+        related_model = model._meta.fields_map[relation].related_model
+        nested = list(collect_relations(related_model, field, name_converter))
+        if nested:
+            yield from (f"{relation}__{n}" for n in nested)
+        else:
+            yield relation
+
+
+def get_node_selection(info: Info, node_type: typing.Type, *path: str) -> NodeSelection:
+    """
+    Analyze what current field selects of node.
+
+    Args:
+        info: The strawberry execution info of current field
+        node_type: The tortoise orm node type
+        path: Graphql names leading from current field to the node
+
+    Returns:
+        NodeSelection: Fields to fetch. Every column is selected if the
+        selection can not be analyzed.
+    """
+    if not info.selected_fields:
+        return NodeSelection()
+
+    selected = info.selected_fields[0]
+    if path:
+        selected = find_selected_field(selected.selections, *path)
+    if selected is None:
+        return NodeSelection(selected=False)
+
+    name_converter = info.schema.config.name_converter
+    graphql_names = {
+        name_converter.get_graphql_name(field): field.python_name
+        for field in get_object_definition(node_type).fields
+    }
+    names = {"id", "created_at"}
+    for field in iter_selected_fields(selected.selections):
+        if python_name := graphql_names.get(field.name):
+            names.add(python_name)
+
+    return NodeSelection(
+        columns=tuple(name for name in node_type.__node_fields__ if name in names),
+        relations=tuple(
+            collect_relations(node_type.__tortoise_model__, selected, name_converter)
+        ),
+    )
+
+
+async def fetch_selection(
+    queryset: QuerySet, selection: NodeSelection
+) -> typing.List[typing.Union[Model, typing.Dict[str, typing.Any]]]:
+    """
+    Fetch rows of queryset, but only what selection needs.
+
+    Rows are `.values()` dicts unless relations are selected, then they are
+    partial models fetched by `.only()` with relations prefetched.
+    """
+    if not selection.selected:
+        return []
+    if selection.columns is None:
+        return await queryset.prefetch_related(*selection.relations)
+    if not selection.relations:
+        return await queryset.values(*selection.columns)
+
+    # foreign keys are required to prefetch forward relations
+    meta = queryset.model._meta
+    source_fields = [
+        meta.fields_map[relation.split("__")[0]].source_field
+        for relation in selection.relations
+        if relation.split("__")[0] in meta.fk_fields
+    ]
+    return await queryset.only(*selection.columns, *source_fields).prefetch_related(
+        *selection.relations
+    )
@@ -5,6 +5,7 @@ __all__ = [
     "ProviderSendNotSupportError",
     "ProviderRecvNotSupportError",
     "ProviderCodeNotFoundError",
+    "ProviderNotFoundError",
 ]
 
 
@@ -18,3 +19,7 @@ class ProviderRecvNotSupportError(DefinedError):
 
 class ProviderCodeNotFoundError(DefinedError):
     message = "provider code not found"
+
+
+class ProviderNotFoundError(DefinedError):
+    message = "provider not found: {ids}"
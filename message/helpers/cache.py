@@ -0,0 +1,55 @@
+# Standard Library
+import time
+import typing
+from collections import OrderedDict
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
+
+class LRUCache(typing.Generic[K, V]):
+    """
+    A bounded cache which evicts the least recently used item when full.
+
+    Items expire `ttl` seconds after being set, if `ttl` is given.
+    """
+
+    def __init__(self, maxsize: int, ttl: typing.Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.items: OrderedDict[K, V] = OrderedDict()
+        self.expires: typing.Dict[K, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.items
+
+    def get(self, key: K, default: typing.Optional[V] = None) -> typing.Optional[V]:
+        try:
+            value = self.items[key]
+        except KeyError:
+            return default
+        if self.ttl is not None and self.expires[key] <= time.monotonic():
+            self.pop(key)
+            return default
+        self.items.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if self.ttl is not None:
+            self.expires[key] = time.monotonic() + self.ttl
+        while len(self.items) > self.maxsize:
+            evicted, _ = self.items.popitem(last=False)
+            self.expires.pop(evicted, None)
+
+    def pop(self, key: K, default: typing.Optional[V] = None) -> typing.Optional[V]:
+        self.expires.pop(key, None)
+        return self.items.pop(key, default)
+
+    def clear(self) -> None:
+        self.items.clear()
+        self.expires.clear()
@@ -4,7 +4,9 @@ from inspect import isasyncgenfunction
 from inspect import iscoroutinefunction
 
 # Third Party Library
+from message.infra import CONNECTION_ERRORS
 from message.infra import infra_check
+from message.infra import invalidate_infra
 
 
 def ensure_infra(*infra_names: list[str], raise_exceptions: bool = True):
@@ -14,7 +16,11 @@ def ensure_infra(*infra_names: list[str], raise_exceptions: bool = True):
             @wraps(func)
             async def wrapped(*args, **kwargs):
                 if await infra_check(*infra_names, raise_exceptions=raise_exceptions):
-                    return await func(*args, **kwargs)
+                    try:
+                        return await func(*args, **kwargs)
+                    except CONNECTION_ERRORS:
+                        invalidate_infra(*infra_names)
+                        raise
 
             return wrapped
 
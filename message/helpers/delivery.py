@@ -0,0 +1,176 @@
+# Standard Library
+import asyncio
+import random
+import typing
+from contextlib import asynccontextmanager
+
+# Third Party Library
+from message.infra import get_infra
+from message.worker import dependency
+from pydantic import BaseModel
+from pydantic import Field
+from ulid import ULID
+
+__all__ = [
+    "DeliveryLimits",
+    "DeliveryLimiter",
+    "delivery_limiter",
+]
+
+# take tokens from a bucket refilled by `rate` tokens per second, up to
+# `burst` tokens. returns milliseconds to wait if tokens are not enough.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = math.ceil((requested - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return wait
+"""
+
+# lease one of `limit` slots for `lease` milliseconds, slots of crashed
+# workers are released when their leases expire. returns 1 if leased.
+SEMAPHORE_ACQUIRE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local lease = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) < limit then
+    redis.call('ZADD', KEYS[1], now + lease, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], lease)
+    return 1
+end
+return 0
+"""
+
+# extend a lease which is still held by another `lease` milliseconds
+SEMAPHORE_RENEW_SCRIPT = """
+local lease = tonumber(ARGV[1])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+if redis.call('ZADD', KEYS[1], 'XX', 'CH', now + lease, ARGV[2]) == 1 then
+    redis.call('PEXPIRE', KEYS[1], lease)
+end
+return 1
+"""
+
+
+class DeliveryLimits(BaseModel):
+    """
+    Limits of sending messages by a provider, shared by all workers.
+
+    Args:
+        concurrency (int): Messages being sent at the same time.
+        rate (float): Messages sent per second in average.
+        burst (int): Messages could be sent at once after being idle.
+        lease (int): Seconds a concurrency slot is held without being renewed,
+            slots of crashed workers are released after it.
+    """
+
+    concurrency: int = Field(default=10, gt=0)
+    rate: float = Field(default=10, gt=0)
+    burst: int = Field(default=10, gt=0)
+    lease: int = Field(default=60, gt=0)
+
+
+class DeliveryLimiter:
+    """
+    Limit concurrency and rate of sending messages per provider by redis.
+
+    Sends over the limits wait for their turn instead of failing, so quotas
+    of SMTP or SMS services queue messages up.
+    """
+
+    SEMAPHORE_KEY = "delivery_semaphore#{provider_id}"
+    TOKEN_BUCKET_KEY = "delivery_token_bucket#{provider_id}"
+    # seconds between attempts to get a concurrency slot
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, config: typing.Optional[dict] = None) -> None:
+        config = dict(config or {})
+        overrides = config.pop("providers", None) or {}
+        self.default_limits = DeliveryLimits.model_validate(config)
+        self.limits = {
+            code: DeliveryLimits.model_validate({**config, **(override or {})})
+            for code, override in overrides.items()
+        }
+        self.scripts = None
+
+    def get_limits(self, code: typing.Optional[str]) -> DeliveryLimits:
+        """
+        Get limits of a kind of provider, by code of its provider template.
+        """
+        return self.limits.get(code, self.default_limits)
+
+    async def get_scripts(self):
+        if self.scripts is None:
+            cache = await get_infra().cache()
+            self.scripts = (
+                cache.redis.register_script(TOKEN_BUCKET_SCRIPT),
+                cache.redis.register_script(SEMAPHORE_ACQUIRE_SCRIPT),
+                cache.redis.register_script(SEMAPHORE_RENEW_SCRIPT),
+                cache.redis,
+            )
+        return self.scripts
+
+    @asynccontextmanager
+    async def limit(
+        self, provider_id: int, code: typing.Optional[str] = None, count: int = 1
+    ):
+        """
+        Wait until the provider is allowed to send `count` more messages now.
+
+        Tokens of all messages are taken before a concurrency slot, so a slot
+        is held only while sending, and its lease is renewed until the sends
+        are done. `count` must not exceed `burst` of the provider, larger
+        batches should be split to keep per second quotas of the provider.
+
+        >>> async with delivery_limiter.limit(provider.id, "email"):
+        >>>     await provider.send_message(message)
+        """
+        limits = self.get_limits(code)
+        if count > limits.burst:
+            raise ValueError(f"count {count} exceeds burst {limits.burst}")
+        take_tokens, acquire, renew, redis = await self.get_scripts()
+        semaphore_key = self.SEMAPHORE_KEY.format(provider_id=provider_id)
+        token = str(ULID())
+
+        while wait := await take_tokens(
+            keys=[self.TOKEN_BUCKET_KEY.format(provider_id=provider_id)],
+            args=[limits.rate, limits.burst, count],
+        ):
+            await asyncio.sleep(wait / 1000)
+
+        while not await acquire(
+            keys=[semaphore_key],
+            args=[limits.concurrency, limits.lease * 1000, token],
+        ):
+            await asyncio.sleep(self.POLL_INTERVAL * (1 + random.random()))
+
+        async def keep_lease():
+            while True:
+                await asyncio.sleep(limits.lease / 3)
+                await renew(keys=[semaphore_key], args=[limits.lease * 1000, token])
+
+        renewer = asyncio.create_task(keep_lease())
+        try:
+            yield
+        finally:
+            renewer.cancel()
+            await redis.zrem(semaphore_key, token)
+
+
+delivery_limiter = DeliveryLimiter(dependency.config.delivery())
@@ -1,71 +1,145 @@
+# Standard Library
+import asyncio
+from collections import defaultdict
+
 # Third Party Library
+import orjson
 from blinker import signal
-from message import applications
 from message.common.constants import SIGNALS
+from message.common.constants import MessageStatusEnum
+from message.helpers.delivery import delivery_limiter
+from message.wiring import ApplicationContainer
 from message.worker import broker
 
-message_create_signal = signal(SIGNALS.MESSAGE_CREATE)
+message_create_batch_signal = signal(SIGNALS.MESSAGE_CREATE_BATCH)
+endpoint_import_signal = signal(SIGNALS.ENDPOINT_IMPORT)
+
+
+@message_create_batch_signal.connect
+async def create_message_batch(sender, message_ids):
+    await background_send_messages.kiq(message_ids=message_ids)
+
 
+@endpoint_import_signal.connect
+async def import_endpoints(sender, import_id):
+    await background_import_endpoints.kiq(import_id=import_id)
 
-@message_create_signal.connect
-async def create_message(
-    sender, message_id, provider_id, content, users, endpoints, contacts
-):
-    await background_create_message.kiq(
-        message_id=message_id,
-        provider_id=provider_id,
-        content=content,
-        users=users,
-        endpoints=endpoints,
-        contacts=contacts,
+
+@broker.task
+async def background_send_messages(message_ids):
+    """
+    Send a chunk of messages created by a batch send
+    """
+    message_application = ApplicationContainer.message_application()
+    qs = await message_application.get_queryset(filters={"id__in": message_ids})
+    messages = await qs.prefetch_related(
+        "provider__provider_template", "users", "endpoints"
+    )
+    messages_of_providers = defaultdict(list)
+    for message in messages:
+        messages_of_providers[message.provider_id].append(message)
+
+    # each provider sends its messages as a batch, and waits for its limits
+    # concurrently, instead of one slow provider holding up the others
+    results = await asyncio.gather(
+        *(
+            deliver_messages(message_application, messages)
+            for messages in messages_of_providers.values()
+        ),
+        return_exceptions=True,
     )
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
 
 
 @broker.task
-async def background_create_message(
-    message_id,
-    provider_id,
-    content,
-    users,
-    endpoints,
-    contacts,
-):
+async def background_import_endpoints(import_id):
+    """
+    Import endpoints of an uploaded file
+    """
+    endpoint_import_application = ApplicationContainer.endpoint_import_application()
+    endpoint_import = await endpoint_import_application.get(id=import_id)
+    if endpoint_import is None:
+        return
+    await endpoint_import_application.run_import(endpoint_import)
+
+
+async def deliver_messages(message_application, messages):
     """
-    Create message
+    Send messages of one provider by its batch api, transitions of status and
+    results of each recipient are published to watchers
     """
-    message_application = applications.MessageApplication()
-    user_application = applications.UserApplication()
-    endpoint_application = applications.EndpointApplication()
-    provider_application = applications.ProviderApplication()
-    try:
-        provider = await provider_application.get_provider(id=provider_id)
-    except Exception:
-        raise
-
-    if users:
+    provider = messages[0].provider
+    provider_application = ApplicationContainer.provider_application()
+    instance = await provider_application.get_provider_instance(provider)
+
+    definitions, sendings = [], []
+    for message in messages:
         try:
-            users = await (
-                await user_application.get_users(conditions={"id__in": users})
+            definitions.append(
+                instance.parse_message(
+                    orjson.loads(message.content or "{}"),
+                    users=[user.id for user in message.users],
+                    endpoints=[str(endpoint.id) for endpoint in message.endpoints],
+                )
             )
-        except Exception:
-            raise
+            sendings.append(message)
+        except (ValueError, TypeError) as error:
+            await message_application.update_status(
+                message,
+                MessageStatusEnum.FAILED,
+                results=[{"status": "failed", "error_message": str(error)}],
+            )
+    if not sendings:
+        return
 
-    if endpoints:
+    # over limits of the provider, messages are queued instead of failed. a
+    # batch sent at once is never larger than burst of the provider
+    code = provider.provider_template.code
+    batch_size = delivery_limiter.get_limits(code).burst
+    pairs = list(zip(sendings, definitions))
+    results = await asyncio.gather(
+        *(
+            deliver_batch(
+                message_application,
+                instance,
+                provider.id,
+                code,
+                pairs[index : index + batch_size],
+            )
+            for index in range(0, len(pairs), batch_size)
+        ),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+
+async def deliver_batch(message_application, instance, provider_id, code, batch):
+    """
+    Send a batch of messages within limits of their provider
+    """
+    messages = [message for message, _ in batch]
+    async with delivery_limiter.limit(provider_id, code, count=len(batch)):
+        for message in messages:
+            await message_application.update_status(message, MessageStatusEnum.SENDING)
         try:
-            endpoints = await (
-                await endpoint_application.get_endpoints(
-                    conditions={"id__in": endpoints}
+            results = await instance.send_batch([definition for _, definition in batch])
+        except Exception as error:
+            for message in messages:
+                await message_application.update_status(
+                    message,
+                    MessageStatusEnum.FAILED,
+                    results=[{"status": "failed", "error_message": str(error)}],
                 )
-            )
-        except Exception:
             raise
 
-    message = await message_application.create_message(
-        id=message_id,
-        provider=provider,
-        content=content,
-        users=users,
-        endpoints=endpoints,
-        contacts=contacts,
-    )
-    await message.provider.send_message(message)
+    for message, recipient_results in zip(messages, results):
+        succeeded = all(result.status == "success" for result in recipient_results)
+        await message_application.update_status(
+            message,
+            MessageStatusEnum.SUCCEEDED if succeeded else MessageStatusEnum.FAILED,
+            results=[result.model_dump(mode="json") for result in recipient_results],
+        )
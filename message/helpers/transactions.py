@@ -0,0 +1,77 @@
+# Standard Library
+import typing
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+# Third Party Library
+from tortoise.transactions import in_transaction as tortoise_in_transaction
+
+__all__ = [
+    "atomic",
+    "in_transaction",
+    "is_in_transaction",
+    "on_commit",
+]
+
+# callbacks to run after the outermost transaction of current context commits
+_on_commit_callbacks: ContextVar[
+    typing.Optional[typing.List[typing.Callable[[], typing.Awaitable]]]
+] = ContextVar("on_commit_callbacks", default=None)
+
+
+@asynccontextmanager
+async def in_transaction(connection_name: typing.Optional[str] = None):
+    """
+    Transaction of tortoise, which runs callbacks registered by `on_commit`
+    after the outermost transaction is committed. Callbacks are dropped if it
+    is rolled back.
+
+    >>> async with in_transaction() as connection:
+    >>>     ...
+    """
+    if _on_commit_callbacks.get() is not None:
+        async with tortoise_in_transaction(connection_name) as connection:
+            yield connection
+        return
+
+    callbacks = []
+    token = _on_commit_callbacks.set(callbacks)
+    try:
+        async with tortoise_in_transaction(connection_name) as connection:
+            yield connection
+    finally:
+        _on_commit_callbacks.reset(token)
+    for callback in callbacks:
+        await callback()
+
+
+def atomic(connection_name: typing.Optional[str] = None):
+    """
+    Run the decorated function in a transaction of `in_transaction`.
+    """
+
+    def wrapper(func):
+        @wraps(func)
+        async def wrapped(*args, **kwargs):
+            async with in_transaction(connection_name):
+                return await func(*args, **kwargs)
+
+        return wrapped
+
+    return wrapper
+
+
+def is_in_transaction() -> bool:
+    return _on_commit_callbacks.get() is not None
+
+
+async def on_commit(callback: typing.Callable[[], typing.Awaitable]) -> None:
+    """
+    Run `callback` after current transaction is committed, or right now if
+    there is no transaction.
+    """
+    if (callbacks := _on_commit_callbacks.get()) is None:
+        await callback()
+    else:
+        callbacks.append(callback)
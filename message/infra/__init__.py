@@ -1,10 +1,15 @@
 # Standard Library
 import asyncio
+import time
 import typing
 
 # Third Party Library
+from asyncpg.exceptions import InterfaceError as PostgresInterfaceError
+from asyncpg.exceptions import PostgresConnectionError
 from dependency_injector import providers
 from dependency_injector.containers import DeclarativeContainer
+from message.common.constants import INFRA_CIRCUIT_COOLDOWN
+from message.common.constants import INFRA_HEALTH_TTL
 from message.common.constants import SETTINGS_YAML
 from message.infra.background import BackgroundSchedulerInfrastructure
 from message.infra.cache import CacheInfrastructure
@@ -13,8 +18,24 @@ from message.infra.persistence import PersistenceInfrastructure
 from message.infra.queue import QueueInfrastructure
 from message.infra.storage import StorageInfrastructure
 from message.infra.websocket import WebsocketInfrastructure
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from tortoise.exceptions import DBConnectionError
 
 __infra__ = None
+__infra_health__: typing.Dict[str, "InfraHealthState"] = {}
+
+# errors meaning database or redis is not reachable anymore, errors of other
+# io, like reading files from storage, never mark an infrastructure down
+CONNECTION_ERRORS = (
+    # raised by drivers connecting to a server which is down
+    ConnectionRefusedError,
+    DBConnectionError,
+    PostgresConnectionError,
+    PostgresInterfaceError,
+    RedisConnectionError,
+    RedisTimeoutError,
+)
 
 
 class InfrastructureContainer(DeclarativeContainer):
@@ -66,11 +87,67 @@ class InfrastructureContainer(DeclarativeContainer):
         WebsocketInfrastructure,
         background_scheduler=background_scheduler,
         distribution=distribution,
+        send_queue_size=config.websocket.send_queue_size,
+        send_queue_policy=config.websocket.send_queue_policy,
+        ping_interval=config.websocket.ping_interval,
+        idle_timeout=config.websocket.idle_timeout,
+        secret_key=config.websocket.secret_key,
     )
 
 
+class InfraHealthState:
+    """
+    Cached health of an infrastructure, which works as a circuit breaker.
+
+    - up and fresh: trusted without any round trip.
+    - up but stale: still trusted, a health check is run in background.
+    - down and fresh: the circuit is open, fail fast.
+    - down but stale: the circuit is half open, callers wait for one check.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.status: typing.Optional[str] = None
+        self.checked_at = 0.0
+        self.refreshing: typing.Optional[asyncio.Task] = None
+
+    @property
+    def ttl(self) -> float:
+        return INFRA_HEALTH_TTL if self.status == "up" else INFRA_CIRCUIT_COOLDOWN
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.checked_at < self.ttl
+
+    async def check(self, infra: InfrastructureContainer) -> str:
+        try:
+            _infra = await getattr(infra, self.name)()
+            status = (await _infra.health_check()).status
+        except Exception:
+            status = "down"
+        self.status = status
+        self.checked_at = time.monotonic()
+        return status
+
+    def refresh(self, infra: InfrastructureContainer) -> asyncio.Task:
+        """
+        Run a health check in background, concurrent callers share it.
+        """
+        if self.refreshing is None or self.refreshing.done():
+            self.refreshing = asyncio.create_task(self.check(infra))
+        return self.refreshing
+
+    def invalidate(self) -> None:
+        """
+        Open the circuit, e.g. when a connection error is raised.
+        """
+        self.status = "down"
+        self.checked_at = time.monotonic()
+
+
 async def initialize_infra(app) -> InfrastructureContainer:
     global __infra__
+    __infra_health__.clear()
     __infra__ = InfrastructureContainer()
     __infra__.config.from_yaml(SETTINGS_YAML)
     await __infra__.init_resources()
@@ -81,21 +158,41 @@ async def shutdown_infra(app) -> None:
     global __infra__
     await asyncio.shield(__infra__.shutdown_resources())
     __infra__ = None
+    __infra_health__.clear()
 
 
 def get_infra() -> InfrastructureContainer:
     return __infra__
 
 
+def invalidate_infra(*infra_names: list[str]) -> None:
+    """
+    Mark infrastructures down until they pass a health check again.
+    """
+    for infra_name in infra_names:
+        __infra_health__.setdefault(infra_name, InfraHealthState(infra_name))
+        __infra_health__[infra_name].invalidate()
+
+
 async def infra_check(*infra_names: list[str], raise_exceptions: bool = True) -> bool:
     infra = get_infra()
     for infra_name in infra_names:
         if not getattr(infra, infra_name):
             raise SystemError(f"Infra {infra_name} not initialized")
-        _infra = await getattr(infra, infra_name)()
-        status = await _infra.health_check()
-        if status.status != "up":
+
+        state = __infra_health__.get(infra_name)
+        if state is None:
+            state = __infra_health__[infra_name] = InfraHealthState(infra_name)
+
+        if state.status is None or (state.status != "up" and not state.is_fresh):
+            status = await state.refresh(infra)
+        else:
+            status = state.status
+            if not state.is_fresh:
+                state.refresh(infra)
+
+        if status != "up":
             if raise_exceptions:
-                raise SystemError(f"Infra {infra_name} {status.status}")
+                raise SystemError(f"Infra {infra_name} {status}")
             return False
     return True
@@ -1,3 +1,9 @@
+# Standard Library
+import asyncio
+import typing
+from contextlib import asynccontextmanager
+from contextlib import suppress
+
 # Third Party Library
 import orjson
 from message.infra.abc import HealthStatus
@@ -8,9 +14,17 @@ class DistributionInfrastructure(Infrastructure):
     async def init(self, cache):
         self.cache = cache
         self.pubsubs = []
+        # one pubsub connection is shared by all listeners of this process
+        self.shared_pubsub = None
+        self.shared_task: asyncio.Task = None
+        self.listeners: typing.Dict[str, typing.Set[asyncio.Queue]] = {}
+        self.loads: typing.Dict[str, typing.Callable[[bytes], typing.Any]] = {}
+        self.listen_lock = asyncio.Lock()
         return self
 
     async def shutdown(self, resource: Infrastructure):
+        if self.shared_task:
+            self.shared_task.cancel()
         try:
             for pubsub in self.pubsubs:
                 await pubsub.close()
@@ -26,8 +40,90 @@ class DistributionInfrastructure(Infrastructure):
         except Exception as e:
             print(e)
 
+    async def publish_raw(self, channel, data: bytes):
+        """
+        Publish data which is serialized already.
+        """
+        try:
+            await self.cache.redis.publish(channel, data)
+        except Exception as e:
+            print(e)
+
     async def subscribe(self, channel):
         pubsub = self.cache.redis.pubsub()
         await pubsub.subscribe(channel)
         self.pubsubs.append(pubsub)
         return pubsub.listen()
+
+    async def dispatch_shared_messages(self):
+        """
+        Read messages of the shared pubsub and put them to listeners' queues.
+        """
+        await self.shared_pubsub.connect()
+        while True:
+            try:
+                message = await self.shared_pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                print(err)
+                await asyncio.sleep(1)
+                continue
+
+            if message is None or message["type"] != "message":
+                continue
+
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            try:
+                data = self.loads.get(channel, orjson.loads)(message["data"])
+            except Exception:
+                continue
+            for queue in self.listeners.get(channel, ()):
+                queue.put_nowait(data)
+
+    @asynccontextmanager
+    async def listen(
+        self, channel, loads: typing.Callable[[bytes], typing.Any] = orjson.loads
+    ) -> typing.AsyncIterator[typing.AsyncIterator]:
+        """
+        Listen to a channel through the shared pubsub of this process.
+
+        Redis subscribes a channel only once however many listeners there are,
+        and unsubscribes it when the last listener leaves. Messages are
+        deserialized by `loads` of the first listener, once for all listeners.
+
+        >>> async with distribution.listen("channel") as messages:
+        >>>     async for data in messages:
+        >>>         ...
+        """
+        queue = asyncio.Queue()
+        async with self.listen_lock:
+            if self.shared_pubsub is None:
+                self.shared_pubsub = self.cache.redis.pubsub()
+                self.pubsubs.append(self.shared_pubsub)
+                self.shared_task = asyncio.create_task(self.dispatch_shared_messages())
+            if channel not in self.listeners:
+                self.listeners[channel] = set()
+                self.loads[channel] = loads
+                await self.shared_pubsub.subscribe(channel)
+            self.listeners[channel].add(queue)
+
+        async def iterate():
+            while True:
+                yield await queue.get()
+
+        try:
+            yield iterate()
+        finally:
+            async with self.listen_lock:
+                listeners = self.listeners.get(channel, set())
+                listeners.discard(queue)
+                if not listeners:
+                    self.listeners.pop(channel, None)
+                    self.loads.pop(channel, None)
+                    with suppress(Exception):
+                        await self.shared_pubsub.unsubscribe(channel)
@@ -115,6 +115,12 @@ class Backend:
     async def delete(self, *names: typing.List[str]) -> bool:
         raise NotImplementedError
 
+    def stream(self, name: str, chunk_size: int) -> typing.AsyncIterator[bytes]:
+        raise NotImplementedError
+
+    async def put_stream(self, name: str, chunks: typing.AsyncIterable[bytes]) -> bool:
+        raise NotImplementedError
+
 
 class LocalFileSystemBackend(Backend, mode="local"):
     def __init__(self, **kwargs):
@@ -213,6 +219,21 @@ class LocalFileSystemBackend(Backend, mode="local"):
 
         return True
 
+    async def stream(self, name: str, chunk_size: int) -> typing.AsyncIterator[bytes]:
+        async with aiofiles.open(self._path(name), "rb") as fp:
+            while chunk := await fp.read(chunk_size):
+                yield chunk
+
+    async def put_stream(self, name: str, chunks: typing.AsyncIterable[bytes]) -> bool:
+        if os.path.exists(self._path(name)) and not self.override:
+            raise FileExistsError("file already exists, but override is False")
+
+        async with aiofiles.open(self._path(name), "wb+") as f:
+            async for chunk in chunks:
+                await f.write(chunk)
+
+        return True
+
     async def delete(self, *names: typing.List[str]) -> bool:
         for path in map(self._path, names):
             if not os.path.exists(path):
@@ -257,6 +278,22 @@ class StorageInfrastructure(Infrastructure):
     async def delete(self, *names: typing.List[str]) -> None:
         await self._backend.delete(*names)
 
+    def stream(
+        self, name: str, chunk_size: int = 64 * 1024
+    ) -> typing.AsyncIterator[bytes]:
+        """
+        Read a file by chunks, without loading it into memory at once.
+        """
+        return self._backend.stream(name, chunk_size)
+
+    async def write_stream(
+        self, name: str, chunks: typing.AsyncIterable[bytes]
+    ) -> None:
+        """
+        Write a file by chunks, without holding it in memory at once.
+        """
+        await self._backend.put_stream(name, chunks)
+
     async def init(
         self, mode: typing.Literal["local"], options: typing.Dict = None
     ) -> "StorageInfrastructure":
@@ -1,10 +1,21 @@
 # Standard Library
 import asyncio
+import datetime
+import enum
+import hashlib
+import hmac
+import inspect
+import math
+import time
 import typing
+import uuid
 from asyncio.queues import Queue
+from collections import defaultdict
+from collections import deque
 from contextlib import suppress
 
 # Third Party Library
+import msgpack
 import orjson
 from fastapi import WebSocket
 from fastapi import WebSocketDisconnect
@@ -13,42 +24,409 @@ from message.infra.abc import HealthStatus
 from message.infra.abc import Infrastructure
 from ulid import ULID
 
+SendQueuePolicy = typing.Literal["drop_oldest", "drop_newest", "disconnect"]
+Frame = typing.Union[str, bytes]
+MISSING = object()
+
+
+class WebsocketCodec(typing.NamedTuple):
+    """
+    How messages are serialized for a websocket subprotocol.
+    """
+
+    subprotocol: str
+    encode: typing.Callable[[typing.Any], Frame]
+    decode: typing.Callable[[Frame], typing.Any]
+
+
+def encode_json(message) -> Frame:
+    """
+    Serialize message into a text frame, str and bytes are sent as they are.
+    """
+    if isinstance(message, (str, bytes)):
+        return message
+    return orjson.dumps(message).decode()
+
+
+def decode_json(frame: Frame) -> typing.Any:
+    try:
+        return orjson.loads(frame)
+    except orjson.JSONDecodeError:
+        return frame
+
+
+def msgpack_default(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"can not serialize {type(value)} by msgpack")
+
+
+def encode_msgpack(message) -> bytes:
+    return msgpack.packb(message, default=msgpack_default)
+
+
+def decode_msgpack(frame: Frame) -> typing.Any:
+    if isinstance(frame, str):
+        return decode_json(frame)
+    try:
+        return msgpack.unpackb(frame)
+    except (ValueError, msgpack.UnpackException):
+        return frame
+
+
+JSON_CODEC = WebsocketCodec("json", encode_json, decode_json)
+MSGPACK_CODEC = WebsocketCodec("msgpack", encode_msgpack, decode_msgpack)
+# subprotocols clients could negotiate, json is used if none is negotiated
+CODECS = {codec.subprotocol: codec for codec in (JSON_CODEC, MSGPACK_CODEC)}
+
+
+def negotiate_subprotocol(offered: typing.Iterable[str]) -> typing.Optional[str]:
+    """
+    Pick the first supported subprotocol offered by client.
+    """
+    for subprotocol in offered:
+        if subprotocol in CODECS:
+            return subprotocol
+    return None
+
+
+class EncodedMessage:
+    """
+    A message to send, serialized at most once per codec.
+
+    Frames are immutable, so one frame is shared by every receiver using the
+    same codec.
+    """
+
+    __slots__ = ("_message", "frames")
+
+    def __init__(self, message=MISSING, frames: typing.Dict[str, Frame] = None):
+        self._message = message
+        self.frames = frames if frames else {}
+
+    @property
+    def message(self):
+        if self._message is MISSING:
+            self._message = MSGPACK_CODEC.decode(self.frames[MSGPACK_CODEC.subprotocol])
+        return self._message
+
+    def frame(self, codec: WebsocketCodec) -> Frame:
+        frame = self.frames.get(codec.subprotocol)
+        if frame is None:
+            frame = self.frames[codec.subprotocol] = codec.encode(self.message)
+        return frame
+
+
+def pack_remote_message(
+    sender, encoded: EncodedMessage, connection_ids=None, topics=None
+) -> bytes:
+    """
+    Build the envelope of a message published to other nodes.
+
+    The envelope is msgpack, and carries the msgpack frame of message as is,
+    so receivers send it to msgpack clients without serializing again.
+
+    The message goes to `connection_ids`, or to subscribers of any of
+    `topics` once, or to every connection if neither is given.
+    """
+    return msgpack.packb(
+        {
+            "sender": sender,
+            "frame": encoded.frame(MSGPACK_CODEC),
+            "connection_ids": connection_ids,
+            "topics": topics,
+        }
+    )
+
+
+def unpack_remote_message(data: bytes) -> typing.Tuple[dict, EncodedMessage]:
+    envelope = msgpack.unpackb(data)
+    frames = {MSGPACK_CODEC.subprotocol: envelope.pop("frame")}
+    return envelope, EncodedMessage(frames=frames)
+
+
+class WebsocketMetrics:
+    """
+    Counters of websocket connections of this node.
+    """
+
+    __slots__ = (
+        "reaped_connections",
+        "pings_sent",
+        "sent_messages",
+        "send_latency_total",
+        "send_latency_max",
+    )
+
+    def __init__(self):
+        self.reaped_connections = 0
+        self.pings_sent = 0
+        self.sent_messages = 0
+        self.send_latency_total = 0.0
+        self.send_latency_max = 0.0
+
+    def observe_send(self, latency: float):
+        self.sent_messages += 1
+        self.send_latency_total += latency
+        if latency > self.send_latency_max:
+            self.send_latency_max = latency
+
+    def snapshot(self, connections: typing.Iterable["WebsocketConnection"]) -> dict:
+        depths = [len(c.send_queue) for c in connections if c.send_queue]
+        return {
+            "reaped_connections": self.reaped_connections,
+            "pings_sent": self.pings_sent,
+            "sent_messages": self.sent_messages,
+            "send_latency_avg": (
+                self.send_latency_total / self.sent_messages
+                if self.sent_messages
+                else 0.0
+            ),
+            "send_latency_max": self.send_latency_max,
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+        }
+
+
+class HeartbeatWheel:
+    """
+    A timer wheel scheduling heartbeat checks of all connections of a node,
+    driven by one task instead of one timer per connection.
+
+    Each slot holds ids of connections to check when the cursor reaches it.
+    Ids are never removed from slots, ids of closed connections are skipped
+    when their slot is due.
+    """
+
+    def __init__(self, interval: float, tick: float = 1.0):
+        self.tick = tick
+        self.slots: typing.List[typing.Set[str]] = [
+            set() for _ in range(max(1, math.ceil(interval / tick)))
+        ]
+        self.cursor = 0
+
+    def schedule(self, connection_id: str, delay: float):
+        """
+        Check connection after `delay` seconds, at most one round later.
+        """
+        ticks = min(max(1, math.ceil(delay / self.tick)), len(self.slots))
+        self.slots[(self.cursor + ticks) % len(self.slots)].add(connection_id)
+
+    def advance(self) -> typing.Set[str]:
+        """
+        Move cursor to the next slot and take ids due in it.
+        """
+        self.cursor = (self.cursor + 1) % len(self.slots)
+        due, self.slots[self.cursor] = self.slots[self.cursor], set()
+        return due
+
+
+class CloseCallbackRunner:
+    """
+    Run close callbacks of connections in batches on the event loop.
+
+    Sync callbacks of a batch run inline and async ones run concurrently,
+    the loop is yielded between batches, so a reconnect storm never stalls
+    other connections for long. Callbacks opted in with `offload` are
+    CPU-heavy ones, they run in the process pool of background scheduler.
+    """
+
+    def __init__(self, background_scheduler=None, batch_size: int = 256):
+        self.background_scheduler = background_scheduler
+        self.batch_size = batch_size
+        self.pending: typing.Deque[typing.Tuple[typing.Callable, str]] = deque()
+        self.task: typing.Optional[asyncio.Task] = None
+
+    def submit(self, callback: typing.Callable, connection_id: str, offload=False):
+        if offload and self.background_scheduler is not None:
+            self.background_scheduler.run_task_in_process_executor(
+                callback,
+                args=(connection_id,),
+            )
+            return
+        self.pending.append((callback, connection_id))
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        try:
+            while self.pending:
+                awaitables = []
+                for _ in range(min(self.batch_size, len(self.pending))):
+                    callback, connection_id = self.pending.popleft()
+                    try:
+                        result = callback(connection_id)
+                    except Exception as err:
+                        print(err)
+                        continue
+                    if inspect.isawaitable(result):
+                        awaitables.append(result)
+                for result in await asyncio.gather(*awaitables, return_exceptions=True):
+                    if isinstance(result, Exception):
+                        print(result)
+                await asyncio.sleep(0)
+        finally:
+            self.task = None
+
 
 class WebsocketConnection:
+    """
+    A websocket connection held by this node.
+
+    Connections are kept compact, because memory is what limits connections
+    of a node. Queues and tasks are only created when they have work to do:
+    the recv queue and notify task when listeners exist, the send queue and
+    writer task while messages are waiting to be sent.
+    """
+
+    __slots__ = (
+        "id",
+        "websocket",
+        "close_callback_runner",
+        "listeners",
+        "close_callbacks",
+        "topics",
+        "recv_queue",
+        "recv_task",
+        "send_queue",
+        "send_task",
+        "send_queue_size",
+        "send_queue_policy",
+        "subprotocol",
+        "codec",
+        "accepted",
+        "closed",
+        "last_seen",
+        "metrics",
+    )
+
     TERMINATE = "terminate#"
+    PONG = {"type": "pong"}
+    # close code used when a client can not keep up with its messages
+    SLOW_CONSUMER_CLOSE_CODE = 1013
+    # close code used when a client stops answering heartbeats
+    IDLE_CLOSE_CODE = 1001
 
     def __init__(
         self,
         id,
         websocket: WebSocket,
-        background_scheduler,
+        close_callback_runner: typing.Optional[CloseCallbackRunner],
         *,
         listeners: typing.List[typing.Callable] = None,
         close_callbacks: typing.List[typing.Callable] = None,
+        send_queue_size: int = 1000,
+        send_queue_policy: SendQueuePolicy = "drop_oldest",
+        subprotocol: typing.Optional[str] = None,
+        metrics: typing.Optional[WebsocketMetrics] = None,
     ):
         self.id = id
         self.websocket = websocket
-        self.background_scheduler = background_scheduler
-        self.recv_task: asyncio.Task = None
-        self.recv_queue = Queue()
-        self.listeners = listeners if listeners else []
-        self.close_callbacks = close_callbacks if close_callbacks else []
-        self.close_event = asyncio.Event()
-
-    async def send(self, message):
-        if isinstance(message, (str, int, float, bool)):
-            send_method = self.websocket.send_text
-        elif isinstance(message, bytes):
-            send_method = self.websocket.send_bytes
-        else:
-            try:
-                message = orjson.dumps(message).decode()
-                send_method = self.websocket.send_text
-            except orjson.JSONDecodeError:
-                send_method = self.websocket.send_json
+        self.close_callback_runner = close_callback_runner
+        self.listeners = list(listeners) if listeners else ()
+        self.close_callbacks = (
+            [(close_callback, False) for close_callback in close_callbacks]
+            if close_callbacks
+            else ()
+        )
+        self.topics: typing.Set[str] = set()
+        self.recv_queue: typing.Optional[Queue] = None
+        self.recv_task: typing.Optional[asyncio.Task] = None
+        self.send_queue: typing.Optional[deque] = None
+        self.send_task: typing.Optional[asyncio.Task] = None
+        self.send_queue_size = send_queue_size
+        self.send_queue_policy = send_queue_policy
+        self.subprotocol = subprotocol
+        self.codec = CODECS.get(subprotocol, JSON_CODEC)
+        self.accepted = False
+        self.closed = False
+        self.last_seen = time.monotonic()
+        self.metrics = metrics
+
+    def add_listener(self, listener: typing.Callable):
+        self.listeners = [*self.listeners, listener]
+
+    def add_close_callback(self, close_callback: typing.Callable, *, offload=False):
+        """
+        Call `close_callback(connection_id)` after connection is closed.
+
+        Callbacks run in batches on the event loop, set `offload` only for
+        CPU-heavy callbacks to run them in a process pool.
+        """
+        self.close_callbacks = [*self.close_callbacks, (close_callback, offload)]
+
+    def enqueue(self, message) -> bool:
+        """
+        Put message to the send queue without waiting.
+
+        When the queue is full, it drops the oldest or the new message, or
+        disconnects the client, according to `send_queue_policy`.
+
+        Returns:
+            bool: Whether the message is queued.
+        """
+        if self.closed:
+            return False
+        if self.send_queue is None:
+            self.send_queue = deque()
+
+        if len(self.send_queue) >= self.send_queue_size:
+            match self.send_queue_policy:
+                case "drop_oldest":
+                    self.send_queue.popleft()
+                case "disconnect":
+                    self.closed = True
+                    self.send_queue = None
+                    asyncio.create_task(
+                        self.websocket.close(code=self.SLOW_CONSUMER_CLOSE_CODE)
+                    )
+                    return False
+                case _:
+                    return False
+
+        self.send_queue.append((time.monotonic(), message))
+        self.start_send_task()
+        return True
+
+    def start_send_task(self):
+        if self.accepted and self.send_task is None and self.send_queue:
+            self.send_task = asyncio.create_task(self.write())
+
+    async def write(self):
+        """
+        Send queued messages until the queue is drained or the client is gone.
+        """
+        try:
+            while self.send_queue:
+                enqueued_at, message = self.send_queue.popleft()
+                if not await self.send(message):
+                    self.closed = True
+                    break
+                if self.metrics is not None:
+                    self.metrics.observe_send(time.monotonic() - enqueued_at)
+        finally:
+            self.send_task = None
+            if not self.send_queue:
+                self.send_queue = None
 
-        with suppress(BaseException):
-            await send_method(message)
+    async def send(self, message) -> bool:
+        """
+        Send a frame, or a message serialized by codec of the connection.
+        """
+        try:
+            if not isinstance(message, (str, bytes)):
+                message = self.codec.encode(message)
+            if isinstance(message, bytes):
+                await self.websocket.send_bytes(message)
+            else:
+                await self.websocket.send_text(message)
+            return True
+        except Exception:
+            return False
 
     async def notify(self, data):
         for listener in self.listeners:
@@ -65,45 +443,140 @@ class WebsocketConnection:
                     break
                 await self.notify(data)
 
+        self.recv_queue = Queue()
         self.recv_task = asyncio.create_task(task())
 
     async def keep_alive(self):
         with suppress(WebSocketDisconnect):
-            async for data in self.websocket.iter_text():
-                try:
-                    data = orjson.loads(data)
-                except orjson.JSONDecodeError:
-                    pass
+            while True:
+                received = await self.websocket.receive()
+                if received["type"] == "websocket.disconnect":
+                    break
+                # any frame from client proves it is alive, pong included
+                self.last_seen = time.monotonic()
+                # nobody is interested in what clients say
+                if not self.listeners:
+                    continue
+                if self.recv_task is None:
+                    await self.start_notify_task()
+                if received.get("bytes") is not None:
+                    data = self.codec.decode(received["bytes"])
+                else:
+                    data = self.codec.decode(received.get("text") or "")
+                if data == self.PONG:
+                    continue
                 try:
                     await self.recv_queue.put(data)
                 except Exception as e:
                     print(e)
 
+    async def close(self, code: int):
+        with suppress(Exception):
+            await self.websocket.close(code=code)
+
     async def send_welcome(self):
         await self.send({"type": "welcome", "id": self.id})
 
     async def init(self):
-        await self.websocket.accept()
-        await self.start_notify_task()
+        await self.websocket.accept(subprotocol=self.subprotocol)
+        self.accepted = True
+        if self.listeners:
+            await self.start_notify_task()
+        self.start_send_task()
 
     async def shutdown(self) -> bool:
-        for close_callback in self.close_callbacks:
-            self.background_scheduler.run_task_in_process_executor(
-                close_callback,
-                args=(self.id,),
-            )
-        self.close_event.set()
-        await self.recv_queue.put(self.TERMINATE)
-        return await self.close_event.wait() and self.recv_task.done()
+        if self.close_callback_runner is not None:
+            for close_callback, offload in self.close_callbacks:
+                self.close_callback_runner.submit(
+                    close_callback, self.id, offload=offload
+                )
+        self.closed = True
+        self.send_queue = None
+        if self.send_task:
+            self.send_task.cancel()
+        if self.recv_task:
+            await self.recv_queue.put(self.TERMINATE)
+            with suppress(Exception):
+                await self.recv_task
+        return True
 
 
 class WebsocketInfrastructure(Infrastructure):
     TERMINATE = "terminate#"
-    REMOTE_CHANNEL = "websocketremote_channel#"
+    # each node only receives messages to connections it holds
+    NODE_CHANNEL = "websocketnode_channel#{id}"
+    # every node receives messages broadcast to all connections
+    BROADCAST_CHANNEL = "websocketbroadcast_channel#"
+    # which nodes hold subscribers of a topic, scored by when they expire
+    TOPIC_KEY = "websocket_topic#{topic}"
+    # topic of connections of a user, by external id of the user, only joined
+    # by connections authenticated as the user
+    USER_TOPIC = "user#{external_id}"
+    # which node holds a connection, kept alive by heartbeats of the node, as
+    # nodes in members of topics
+    CONNECTION_KEY = "websocket_connection#{id}"
+    REGISTRY_TTL = 60
+    REGISTRY_HEARTBEAT_INTERVAL = 20
 
     def __init__(self):
         self.write_lock = asyncio.Lock()
         self.connections = {}
+        self.send_queue_size = 1000
+        self.send_queue_policy: SendQueuePolicy = "drop_oldest"
+        # inverted index of topic to local connection ids
+        self.topics: typing.Dict[str, typing.Set[str]] = {}
+        # seconds of silence before a client is pinged, and before it is reaped,
+        # both are disabled by default, as clients have to answer the pings
+        self.ping_interval: typing.Optional[float] = None
+        self.idle_timeout: typing.Optional[float] = None
+        self.heartbeat: typing.Optional[HeartbeatWheel] = None
+        # key signing tokens of users, users can not connect without it
+        self.secret_key: typing.Optional[str] = None
+        self.metrics = WebsocketMetrics()
+
+    @property
+    def redis(self):
+        return self.distribution.cache.redis
+
+    def sign_user(self, external_id: str, expires_in: int = 3600) -> str:
+        """
+        Issue a token authenticating connections of a user.
+
+        Token is `{external_id}:{expires_at}:{signature}`, where the signature
+        is hex of HMAC-SHA256 of `{external_id}:{expires_at}` by the secret key,
+        so backends sharing the key could issue tokens themselves.
+        """
+        if not self.secret_key:
+            raise ValueError("secret_key of websocket is not configured")
+        payload = f"{external_id}:{int(time.time()) + expires_in}"
+        signature = hmac.new(
+            self.secret_key.encode(), payload.encode(), hashlib.sha256
+        ).hexdigest()
+        return f"{payload}:{signature}"
+
+    def authenticate(self, token: str) -> typing.Optional[str]:
+        """
+        Get external id of the user a token is issued for, None if the token
+        is invalid or expired.
+        """
+        if not self.secret_key:
+            return None
+        try:
+            external_id, expires_at, signature = token.rsplit(":", 2)
+            expired = int(expires_at) < time.time()
+        except ValueError:
+            return None
+        expected = hmac.new(
+            self.secret_key.encode(),
+            f"{external_id}:{expires_at}".encode(),
+            hashlib.sha256,
+        ).hexdigest()
+        if expired or not hmac.compare_digest(signature, expected):
+            return None
+        return external_id
+
+    def is_user_topic(self, topic: str) -> bool:
+        return topic.startswith(self.USER_TOPIC.format(external_id=""))
 
     def generate_id(self) -> ULID:
         generated = str(ULID())
@@ -112,6 +585,7 @@ class WebsocketInfrastructure(Infrastructure):
         return generated
 
     async def health_check(self) -> HealthStatus:
+        metrics = self.metrics.snapshot(self.connections.values())
         return HealthStatus(
             status="up",
             checks=[
@@ -119,34 +593,193 @@ class WebsocketInfrastructure(Infrastructure):
                     check="init check",
                     status="up",
                     result="inited",
-                )
+                ),
+                CheckResult(
+                    check="connections check",
+                    status="up",
+                    result=orjson.dumps(
+                        {"connections": len(self.connections), **metrics}
+                    ).decode(),
+                ),
             ],
         )
 
-    async def start_listen_remote_message(self):
-        async for message in await self.distribution.subscribe(self.REMOTE_CHANNEL):
-            if message["type"] == "message":
-                data = message["data"]
+    async def start_heartbeat(self):
+        """
+        Ping silent clients and reap the ones silent for too long.
+
+        Clients are sent `{"type": "ping"}` after `ping_interval` seconds of
+        silence, and answer any frame, `{"type": "pong"}` is suggested, which
+        is never passed to listeners. Clients silent for `idle_timeout`
+        seconds are reaped if `idle_timeout` is set.
+
+        Every connection is checked about once per `ping_interval` by the
+        heartbeat wheel, all by this single task.
+        """
+        ping = EncodedMessage({"type": "ping"})
+        while True:
+            await asyncio.sleep(self.heartbeat.tick)
+            now = time.monotonic()
+            for connection_id in self.heartbeat.advance():
+                connection = self.connections.get(connection_id)
+                if connection is None:
+                    continue
+                idle = now - connection.last_seen
+                if self.idle_timeout and idle >= self.idle_timeout:
+                    await self.reap_connection(connection)
+                    continue
+                if idle >= self.ping_interval:
+                    connection.enqueue(ping.frame(connection.codec))
+                    self.metrics.pings_sent += 1
+                self.heartbeat.schedule(
+                    connection_id,
+                    (
+                        min(self.ping_interval, self.idle_timeout - idle)
+                        if self.idle_timeout
+                        else self.ping_interval
+                    ),
+                )
+
+    async def reap_connection(self, connection: WebsocketConnection):
+        """
+        Drop an unresponsive connection, closing may never finish for
+        half-open sockets, so it is not waited.
+        """
+        self.metrics.reaped_connections += 1
+        asyncio.create_task(connection.close(connection.IDLE_CLOSE_CODE))
+        await self.remove_connection(connection)
+
+    async def start_listen_remote_message(self, channel):
+        async with self.distribution.listen(channel, loads=bytes) as messages:
+            async for data in messages:
                 try:
-                    data = orjson.loads(data)
-                    if data["sender"] == self.id:
+                    envelope, encoded = unpack_remote_message(data)
+                    if envelope["sender"] == self.id:
                         continue
-                    await self.local_send(
-                        data["message"],
-                        connection_ids=data["connection_ids"],
-                    )
+                    if envelope["topics"] is not None:
+                        connection_ids = self.topic_subscribers(envelope["topics"])
+                    elif envelope["connection_ids"] is None:
+                        connection_ids = list(self.connections)
+                    else:
+                        connection_ids = envelope["connection_ids"]
+                    self.local_send_encoded(encoded, connection_ids)
                 except Exception as err:
                     print(err)
 
-    async def init(self, background_scheduler, distribution) -> Infrastructure:
+    async def start_registry_heartbeat(self):
+        """
+        Refresh registry of local connections and topics before they expire.
+        """
+        while True:
+            await asyncio.sleep(self.REGISTRY_HEARTBEAT_INTERVAL)
+            try:
+                await self.register_connections(*self.connections)
+                await self.register_topics(*self.topics)
+            except Exception as err:
+                print(err)
+
+    async def register_connections(self, *connection_ids):
+        if not connection_ids:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for connection_id in connection_ids:
+                pipe.set(
+                    self.CONNECTION_KEY.format(id=connection_id),
+                    self.id,
+                    ex=self.REGISTRY_TTL,
+                )
+            await pipe.execute()
+
+    async def register_topics(self, *topics):
+        """
+        Join or stay in members of topics, members of crashed nodes expire.
+        """
+        if not topics:
+            return
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for topic in topics:
+                key = self.TOPIC_KEY.format(topic=topic)
+                pipe.zremrangebyscore(key, "-inf", now)
+                pipe.zadd(key, {self.id: now + self.REGISTRY_TTL})
+                pipe.expire(key, self.REGISTRY_TTL)
+            await pipe.execute()
+
+    async def unregister_topics(self, *topics):
+        if not topics:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for topic in topics:
+                pipe.zrem(self.TOPIC_KEY.format(topic=topic), self.id)
+            await pipe.execute()
+
+    def topic_subscribers(self, topics: typing.Iterable[str]) -> typing.Set[str]:
+        """
+        Ids of local connections subscribing any of topics.
+        """
+        subscribers = set()
+        for topic in topics:
+            subscribers.update(self.topics.get(topic, ()))
+        return subscribers
+
+    async def unregister_connections(self, *connection_ids):
+        if not connection_ids:
+            return
+        await self.redis.delete(
+            *(
+                self.CONNECTION_KEY.format(id=connection_id)
+                for connection_id in connection_ids
+            )
+        )
+
+    async def init(
+        self,
+        background_scheduler,
+        distribution,
+        send_queue_size: int = None,
+        send_queue_policy: SendQueuePolicy = None,
+        ping_interval: typing.Optional[float] = None,
+        idle_timeout: typing.Optional[float] = None,
+        secret_key: str = None,
+    ) -> Infrastructure:
         self.id = str(ULID())
+        self.send_queue_size = send_queue_size or self.send_queue_size
+        self.send_queue_policy = send_queue_policy or self.send_queue_policy
+        # heartbeats are disabled if `ping_interval` is 0 or None, and idle
+        # clients are kept if `idle_timeout` is 0 or None
+        self.ping_interval = ping_interval or None
+        self.idle_timeout = idle_timeout or None
+        self.secret_key = secret_key or self.secret_key
+        if self.ping_interval:
+            self.heartbeat = HeartbeatWheel(self.ping_interval)
         self.background_scheduler = background_scheduler
+        self.close_callback_runner = CloseCallbackRunner(background_scheduler)
         self.distribution = distribution
-        self.background_task = asyncio.create_task(self.start_listen_remote_message())
+        self.background_task = asyncio.create_task(
+            self.start_listen_remote_message(self.NODE_CHANNEL.format(id=self.id))
+        )
+        self.broadcast_task = asyncio.create_task(
+            self.start_listen_remote_message(self.BROADCAST_CHANNEL)
+        )
+        self.registry_heartbeat_task = asyncio.create_task(
+            self.start_registry_heartbeat()
+        )
+        self.heartbeat_task = (
+            asyncio.create_task(self.start_heartbeat()) if self.heartbeat else None
+        )
         return self
 
     async def shutdown(self, resource: Infrastructure):
         self.background_task.cancel()
+        self.broadcast_task.cancel()
+        self.registry_heartbeat_task.cancel()
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+        with suppress(Exception):
+            await self.unregister_connections(*self.connections)
+        with suppress(Exception):
+            await self.unregister_topics(*self.topics)
+        self.topics.clear()
         for connection in self.connections.values():
             await connection.shutdown()
         self.connections.clear()
@@ -156,48 +789,208 @@ class WebsocketInfrastructure(Infrastructure):
         add connection to connections
         """
         connection_id = self.generate_id()
+        subprotocol = negotiate_subprotocol(connection.scope.get("subprotocols", ()))
         try:
             async with self.write_lock:
                 self.connections[connection_id] = WebsocketConnection(
                     connection_id,
                     connection,
-                    self.background_scheduler,
+                    self.close_callback_runner,
+                    send_queue_size=self.send_queue_size,
+                    send_queue_policy=self.send_queue_policy,
+                    subprotocol=subprotocol,
+                    metrics=self.metrics,
                 )
+                if self.heartbeat is not None:
+                    self.heartbeat.schedule(connection_id, self.ping_interval)
+        except Exception as e:
+            print(e)
+        try:
+            await self.register_connections(connection_id)
         except Exception as e:
             print(e)
         return self.connections[connection_id]
 
     async def remove_connection(self, connection: WebsocketConnection):
+        # connections may be reaped before their endpoints finish
+        if self.connections.pop(connection.id, None) is None:
+            return
+        with suppress(Exception):
+            await self.unregister_connections(connection.id)
+        if connection.topics:
+            with suppress(Exception):
+                await self.unsubscribe(connection, *connection.topics)
         await connection.shutdown()
-        self.connections.pop(connection.id, None)
 
-    async def local_send(self, message, connection_ids) -> typing.List[bool]:
+    async def subscribe(self, connection: WebsocketConnection, *topics: str):
+        """
+        Subscribe a local connection to topics.
+
+        A node joins the redis members of a topic when it gets the first
+        local subscriber of the topic.
+        """
+        joined = []
+        for topic in topics:
+            subscribers = self.topics.setdefault(topic, set())
+            if not subscribers:
+                joined.append(topic)
+            subscribers.add(connection.id)
+            connection.topics.add(topic)
+
+        await self.register_topics(*joined)
+
+    async def unsubscribe(self, connection: WebsocketConnection, *topics: str):
+        """
+        Unsubscribe a local connection from topics.
+
+        A node leaves the redis members of a topic when its last local
+        subscriber of the topic leaves.
+        """
+        left = []
+        for topic in topics:
+            connection.topics.discard(topic)
+            subscribers = self.topics.get(topic)
+            if subscribers is None:
+                continue
+            subscribers.discard(connection.id)
+            if not subscribers:
+                del self.topics[topic]
+                left.append(topic)
+
+        await self.unregister_topics(*left)
+
+    async def publish(self, message, *topics: str) -> int:
+        """
+        Send message to subscribers of topics on every node.
+
+        Local subscribers are found by the inverted index, and the message is
+        published once to each node having subscribers of any of topics, so
+        a connection subscribing several of topics gets it once.
+
+        Returns:
+            int: Quantity of local connections the message is queued to.
+        """
+        encoded = EncodedMessage(message)
+        queued = sum(self.local_send_encoded(encoded, self.topic_subscribers(topics)))
+
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for topic in topics:
+                pipe.zrangebyscore(self.TOPIC_KEY.format(topic=topic), now, "+inf")
+            members = await pipe.execute()
+
+        grouped = defaultdict(list)
+        for topic, nodes in zip(topics, members):
+            for node in nodes:
+                node = node.decode() if isinstance(node, bytes) else node
+                if node != self.id:
+                    grouped[node].append(topic)
+
+        for node, node_topics in grouped.items():
+            await self.distribution.publish_raw(
+                self.NODE_CHANNEL.format(id=node),
+                pack_remote_message(self.id, encoded, topics=node_topics),
+            )
+        return queued
+
+    async def send_to_users(self, message, external_ids) -> int:
+        """
+        Send message to connections of users, by external ids of users.
+        """
+        return await self.publish(
+            message,
+            *(
+                self.USER_TOPIC.format(external_id=external_id)
+                for external_id in external_ids
+            ),
+        )
+
+    def local_send_encoded(
+        self, encoded: EncodedMessage, connection_ids
+    ) -> typing.List[bool]:
+        """
+        Queue frames of message to local connections, each codec serializes
+        the message once. Slow clients never block others.
+
+        Returns whether message is queued for each connection.
+        """
         ret = []
         for connection_id in connection_ids:
             connection = self.connections.get(connection_id)
             if connection:
-                try:
-                    await connection.send(message)
-                    ret.append(True)
-                except Exception:
-                    ret.append(False)
+                ret.append(connection.enqueue(encoded.frame(connection.codec)))
             else:
                 ret.append(False)
         return ret
 
+    async def remote_send_encoded(
+        self, encoded: EncodedMessage, connection_ids
+    ) -> typing.List[bool]:
+        """
+        Publish message to nodes holding the connections, one publish per node.
+
+        Returns whether each connection is registered by an online node.
+        """
+        if not connection_ids:
+            return []
+        nodes = await self.redis.mget(
+            [
+                self.CONNECTION_KEY.format(id=connection_id)
+                for connection_id in connection_ids
+            ]
+        )
+        grouped = defaultdict(list)
+        for connection_id, node in zip(connection_ids, nodes):
+            if node is not None:
+                grouped[node.decode() if isinstance(node, bytes) else node].append(
+                    connection_id
+                )
+
+        for node, node_connection_ids in grouped.items():
+            await self.distribution.publish_raw(
+                self.NODE_CHANNEL.format(id=node),
+                pack_remote_message(self.id, encoded, node_connection_ids),
+            )
+        return [node is not None for node in nodes]
+
+    async def local_send(self, message, connection_ids) -> typing.List[bool]:
+        return self.local_send_encoded(EncodedMessage(message), connection_ids)
+
     async def remote_send(self, message, connection_ids) -> typing.List[bool]:
-        data = {"sender": self.id, "message": message, "connection_ids": connection_ids}
-        await self.distribution.publish(self.REMOTE_CHANNEL, data)
+        return await self.remote_send_encoded(EncodedMessage(message), connection_ids)
 
     async def send(self, message, connection_ids) -> typing.List[bool]:
-        reachable = list(set(filter(lambda x: x in self.connections, connection_ids)))
-        unreachable = list(
-            set(filter(lambda x: x not in self.connections, connection_ids))
+        """
+        Send message to connections of any node, message is serialized once
+        per codec.
+
+        Returns whether message is delivered to each connection, in the order
+        of `connection_ids`, local ones are queued and remote ones are
+        published to their nodes.
+        """
+        encoded = EncodedMessage(message)
+        reachable = [x for x in connection_ids if x in self.connections]
+        unreachable = list({x for x in connection_ids if x not in self.connections})
+
+        results = dict(zip(reachable, self.local_send_encoded(encoded, reachable)))
+        results.update(
+            zip(unreachable, await self.remote_send_encoded(encoded, unreachable))
         )
-        results = []
+        return [results[connection_id] for connection_id in connection_ids]
+
+    async def broadcast(self, message) -> int:
+        """
+        Send message to every connection of every node.
 
-        async with asyncio.TaskGroup() as tg:
-            tg.create_task(self.local_send(message, reachable))
-            tg.create_task(self.remote_send(message, unreachable))
+        Message is serialized once per codec, frames are shared by all local
+        connections and the msgpack frame is published to other nodes as is.
 
-        return results
+        Returns:
+            int: Quantity of local connections the message is queued to.
+        """
+        encoded = EncodedMessage(message)
+        queued = sum(self.local_send_encoded(encoded, list(self.connections)))
+        await self.distribution.publish_raw(
+            self.BROADCAST_CHANNEL, pack_remote_message(self.id, encoded)
+        )
+        return queued
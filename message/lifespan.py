@@ -4,13 +4,21 @@ from contextlib import asynccontextmanager
 # Third Party Library
 from fastapi import FastAPI
 from message.apis import schema
+from message.common.graphql.dataloader import TortoiseDataLoaderRegistry
 from message.helpers.decorators import ensure_infra
 from message.helpers.toml import read_toml
+from message.helpers.transactions import in_transaction
 from message.infra import initialize_infra
 from message.infra import shutdown_infra
 from message.wiring import ApplicationContainer
 from strawberry.fastapi.router import GraphQLRouter
-from tortoise.transactions import in_transaction
+
+
+async def get_graphql_context() -> dict:
+    """
+    build context of each graphql request
+    """
+    return {"dataloaders": TortoiseDataLoaderRegistry()}
 
 
 async def initialize_graphql_api(app: FastAPI):
@@ -18,7 +26,7 @@ async def initialize_graphql_api(app: FastAPI):
     initialize graphql api
     """
 
-    graphql_router = GraphQLRouter(schema)
+    graphql_router = GraphQLRouter(schema, context_getter=get_graphql_context)
     app.include_router(graphql_router, prefix="/graphql", tags=["graphql"])
 
 
@@ -75,8 +83,12 @@ async def lifespan(app: FastAPI):
     await initialize_fixtures(app)
     # initialize graphql api
     await initialize_graphql_api(app)
+    # sample health of infrastructure in background
+    health_application = ApplicationContainer.health_application()
+    await health_application.start_sampler()
 
     yield
 
+    await health_application.stop_sampler()
     # shutdown infrastructure container
     await shutdown_infra(app)
@@ -1,7 +1,12 @@
+# Standard Library
+import typing
+
 # Third Party Library
 from fastapi import Depends
 from fastapi import FastAPI
+from fastapi import Query
 from fastapi import WebSocket
+from fastapi import status
 from message.infra import InfrastructureContainer
 from message.infra import get_infra
 from message.lifespan import lifespan
@@ -18,11 +23,25 @@ app = FastAPI(
 async def websocket_endpoint(
     websocket: WebSocket,
     infra: InfrastructureContainer = Depends(get_infra),
+    token: typing.Optional[str] = None,
+    topics: typing.List[str] = Query(default=[]),
 ):
+    infra_websocket = await infra.websocket()
+    # topics of users are only joined by the authenticated user
+    if any(infra_websocket.is_user_topic(topic) for topic in topics):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if token is not None:
+        if (user := infra_websocket.authenticate(token)) is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        topics = [*topics, infra_websocket.USER_TOPIC.format(external_id=user)]
+
+    connection = await infra_websocket.add_connection(websocket)
     try:
-        infra_websocket = await infra.websocket()
-        connection = await infra_websocket.add_connection(websocket)
         await connection.init()
+        if topics:
+            await infra_websocket.subscribe(connection, *topics)
         await connection.send_welcome()
         await connection.keep_alive()
     finally:
@@ -1,5 +1,6 @@
 # Local Folder
 from .contact import ContactMixin
+from .endpoint import EndpointImportMixin
 from .endpoint import EndpointMixin
 from .message import MessageMixin
 from .provider import ProviderMixin
@@ -3,12 +3,14 @@ import enum
 import re
 import typing
 from collections import namedtuple
-from contextlib import suppress
 
 # Third Party Library
 import jsonschema
+from message.common.constants import CONTACT_DEFINITION_CACHE_SIZE
 from message.exceptions.contact import ContactDuplicatedCodeError
+from message.helpers.cache import LRUCache
 from pydantic import BaseModel
+from pydantic import PrivateAttr
 from pydantic import ValidationInfo
 from pydantic import field_validator
 from pydantic import model_validator
@@ -20,6 +22,10 @@ class ContactDefinitionModel(BaseModel):
     type: typing.Literal["jsonschema", "regex"] = "jsonschema"
     contact_schema: typing.Union[typing.Dict, str]
 
+    _validator: typing.Optional[typing.Callable[[typing.Any], bool]] = PrivateAttr(
+        default=None
+    )
+
     def check_regex(self):
         try:
             re.compile(self.contact_schema)
@@ -47,16 +53,57 @@ class ContactDefinitionModel(BaseModel):
         return self
 
     def validate_contact(self, contact: typing.Any) -> ValidationResult:
+        return self.validate_contacts([contact])[0]
+
+    def get_validator(self) -> typing.Callable[[typing.Any], bool]:
+        """
+        Get validator of contact values, compiled on the first call.
+        """
+        if self._validator is not None:
+            return self._validator
+
         if self.type == "jsonschema":
-            with suppress(jsonschema.ValidationError):
-                jsonschema.validate(contact["jsonschema"], self.contact_schema)
-                return ValidationResult(valid=True, validated_data=contact)
-        elif self.type == "regex":
-            if isinstance(contact, dict) and re.match(
-                self.contact_schema, contact.get("regex", "")
-            ):
-                return ValidationResult(valid=True, validated_data=contact)
-        return ValidationResult(valid=False, validated_data=None)
+            validator_class = jsonschema.validators.validator_for(self.contact_schema)
+            validator_class.check_schema(self.contact_schema)
+            schema_validator = validator_class(self.contact_schema)
+
+            def validator(contact: typing.Any) -> bool:
+                try:
+                    return schema_validator.is_valid(contact["jsonschema"])
+                except (KeyError, TypeError):
+                    return False
+
+        else:
+            pattern = re.compile(self.contact_schema)
+
+            def validator(contact: typing.Any) -> bool:
+                return isinstance(contact, dict) and bool(
+                    pattern.match(contact.get("regex", ""))
+                )
+
+        self._validator = validator
+        return validator
+
+    def validate_contacts(
+        self, contacts: typing.Iterable[typing.Any]
+    ) -> typing.List[ValidationResult]:
+        """
+        Validate many contact values, the schema is compiled once for all.
+        """
+        validator = self.get_validator()
+        return [
+            ValidationResult(valid=True, validated_data=contact)
+            if validator(contact)
+            else ValidationResult(valid=False, validated_data=None)
+            for contact in contacts
+        ]
+
+
+# compiled definitions of saved contacts, by contact id and updated_at, so an
+# updated contact is compiled again
+contact_definitions: LRUCache[
+    typing.Tuple[int, typing.Any], ContactDefinitionModel
+] = LRUCache(maxsize=CONTACT_DEFINITION_CACHE_SIZE)
 
 
 class ContactMixin:
@@ -104,6 +151,32 @@ class ContactMixin:
         Returns:
             bool: True if the contact value is valid, False otherwise.
         """
-        definition_model = ContactDefinitionModel.model_validate(self.definition)
-        validated_result = definition_model.validate_contact(contact_value)
-        return validated_result
+        return self.get_definition_model().validate_contact(contact_value)
+
+    def validate_endpoint_values(
+        self, contact_values: typing.Iterable[str | dict]
+    ) -> typing.List[ValidationResult]:
+        """
+        Validate many contact values by parsing the contact schema only once.
+
+        Args:
+            contact_values (Iterable[str | dict]): The contact values to be validated.
+
+        Returns:
+            list[ValidationResult]: Results in the same order as `contact_values`.
+        """
+        return self.get_definition_model().validate_contacts(contact_values)
+
+    def get_definition_model(self) -> ContactDefinitionModel:
+        """
+        Get the compiled definition of contact, cached once the contact is saved.
+        """
+        if not self._saved_in_db:
+            return ContactDefinitionModel.model_validate(self.definition)
+
+        key = (self.id, self.updated_at)
+        definition_model = contact_definitions.get(key)
+        if definition_model is None:
+            definition_model = ContactDefinitionModel.model_validate(self.definition)
+            contact_definitions.set(key, definition_model)
+        return definition_model
@@ -22,3 +22,11 @@ class EndpointMixin:
         if raise_exception and not valid:
             raise EndpointInvalidValueError
         return valid
+
+
+class EndpointImportMixin:
+    async def validate(self, raise_exception: bool = False) -> bool:
+        """
+        Validate the endpoint import, its rows are validated while importing.
+        """
+        return True
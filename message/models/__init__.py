@@ -1,6 +1,7 @@
 # Local Folder
 from .contact import Contact
 from .endpoint import Endpoint
+from .endpoint import EndpointImport
 from .message import Message
 from .provider import Provider
 from .provider import ProviderTemplate
@@ -1,5 +1,7 @@
 # Third Party Library
 from message import mixins
+from message.common.constants import EndpointImportFormatEnum
+from message.common.constants import EndpointImportStatusEnum
 from message.common.models import BaseModel
 from tortoise import fields
 
@@ -22,3 +24,25 @@ class Endpoint(mixins.EndpointMixin, BaseModel):
 
     class Meta:
         table = "endpoints"
+
+
+class EndpointImport(mixins.EndpointImportMixin, BaseModel):
+    """
+    An endpoint import represents a file of endpoints imported in background
+    """
+
+    file = fields.CharField(max_length=255)
+    format = fields.CharEnumField(EndpointImportFormatEnum)
+    status = fields.CharEnumField(
+        EndpointImportStatusEnum,
+        default=EndpointImportStatusEnum.PENDING,
+    )
+    # rows read, endpoints imported and rows failed so far
+    total = fields.BigIntField(default=0)
+    imported = fields.BigIntField(default=0)
+    failed = fields.BigIntField(default=0)
+    errors = fields.JSONField(default=list)
+    finished_at = fields.DatetimeField(null=True)
+
+    class Meta:
+        table = "endpoint_imports"
@@ -29,3 +29,5 @@ class Message(mixins.MessageMixin, BaseModel):
 
     class Meta:
         table = "messages"
+        # required by keyset pagination of TortoiseORMCursorConnection
+        indexes = (("created_at", "id"),)
@@ -1,4 +1,4 @@
 # Local Folder
 from ._apprise import *
-from .socketio import *
+from .email import *
 from .websocket import *
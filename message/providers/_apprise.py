@@ -118,26 +118,30 @@ def convert(plugin):
     else:
         code = stringcase.lowercase(protocols[0])
 
-    newcls = type(
-        f"Apprise{stringcase.pascalcase(code)}Provider",
-        (ProviderBase,),
+    class_name = f"Apprise{stringcase.pascalcase(code)}Provider"
+    meta = type(
+        "Meta",
+        (),
         {
-            "name": code,
+            "name": service_name,
+            "code": code,
             "description": "Apprise Provider - {name}\nService: {service_url}\nSetup: {setup_url}".format(
                 name=service_name, service_url=service_url, setup_url=setup_url
             ),
             "can_send": True,
+            "can_recv": False,
             "supported_contacts": [],  # TODO: 将apprise的target值转换为ContactEnum
-            "parameter_definition": create_model(
-                f"Apprise{stringcase.pascalcase(code)}ProviderParameterDefinition",
+            "connection_definition": create_model(
+                f"{class_name}ConnectionDefinition",
                 **connection_parameters,
             ),
             "message_definition": create_model(
-                f"Apprise{stringcase.pascalcase(code)}ProviderMessageDefinition",
+                f"{class_name}MessageDefinition",
                 **message_parameters,
             ),
         },
     )
+    return type(class_name, (ProviderBase,), {"Meta": meta})
 
 
 def apprise_provider_converter(service_name: str):
@@ -155,8 +159,8 @@ def get_apprise_provider_converter(service_name: str):
 apprise_providers = []
 manager = NotificationManager()
 for plugin in manager.plugins(include_disabled=False):
-    converter = get_apprise_provider_converter(service_name=plugin.service_name)
-    provider = converter(plugin)
+    convert_plugin = get_apprise_provider_converter(service_name=plugin.service_name)
+    provider = convert_plugin(plugin)
     apprise_providers.append(provider)
 
 # 如何解决target的转换成pydantic可以校验的类型
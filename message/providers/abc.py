@@ -1,10 +1,13 @@
 # Standard Library
+import asyncio
 import typing
 from datetime import datetime
 from datetime import timezone
 from inspect import isclass
 
 # Third Party Library
+import httpx
+from message.exceptions.provider import ProviderCodeNotFoundError
 from message.wiring import ApplicationContainer
 from pydantic import BaseModel
 from pydantic import ConfigDict
@@ -14,7 +17,8 @@ from pydantic import Field
 class ProcessResult(BaseModel):
     status: typing.Literal["success", "failed"]
     error_message: typing.Optional[str] = Field(default=None)
-    processed_at: datetime = Field(default_factory=datetime.now(timezone.utc))
+    recipient: typing.Optional[str] = Field(default=None)
+    processed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 class MessageDefinition(BaseModel):
@@ -35,10 +39,10 @@ class ProviderInfo(BaseModel):
     supported_contacts: typing.List[str] = Field(default_factory=list)
 
     can_send: bool  # which means this provider allow sending messages.
-    can_read: bool  # which means this provider allow subscribing incoming messages.
+    can_recv: bool  # which means this provider allow subscribing incoming messages.
 
-    connection_definition: BaseModel
-    message_definition: BaseModel
+    connection_definition: typing.Type[BaseModel]
+    message_definition: typing.Type[BaseModel]
 
     abstract: bool = False
 
@@ -46,9 +50,12 @@ class ProviderInfo(BaseModel):
 
 
 class ProviderMetaclass(type):
+    # concrete provider classes by their codes
+    registry: typing.Dict[str, type] = {}
+
     def __new__(cls, name, bases, attrs):
-        if "Meta" not in attrs and isclass(attrs["Meta"]):
-            raise ValueError("Provider must have a Meta class")
+        if "Meta" not in attrs or not isclass(attrs["Meta"]):
+            raise ValueError(f"Provider {name} must have a Meta class")
 
         metacls = attrs.pop("Meta")
         if hasattr(metacls, "abstract") and metacls.abstract:
@@ -57,7 +64,19 @@ class ProviderMetaclass(type):
         info = ProviderInfo.model_validate(metacls(), from_attributes=True)
         attrs["meta"] = info
 
-        return super().__new__(cls, name, bases, attrs)
+        provider_class = super().__new__(cls, name, bases, attrs)
+        cls.registry[info.code] = provider_class
+        return provider_class
+
+
+def get_provider_class(code: str) -> typing.Type["ProviderBase"]:
+    """
+    Get provider class by code of its provider template.
+    """
+    try:
+        return ProviderMetaclass.registry[code]
+    except KeyError:
+        raise ProviderCodeNotFoundError
 
 
 class ProviderBase(metaclass=ProviderMetaclass):
@@ -65,17 +84,79 @@ class ProviderBase(metaclass=ProviderMetaclass):
         abstract = True
 
     applications: typing.ClassVar[ApplicationContainer] = ApplicationContainer
+    # shared by all http based providers, so connections are pooled across them
+    http_client: typing.ClassVar[typing.Optional[httpx.AsyncClient]] = None
 
     def __init__(self, connection_params: typing.Union[dict, BaseModel]) -> None:
         self.connection_params = self.meta.connection_definition.model_validate(
             connection_params, from_attributes=True
         )
 
+    def parse_message(
+        self,
+        content: dict,
+        users: typing.Sequence[int] = (),
+        endpoints: typing.Sequence[int] = (),
+    ) -> BaseModel:
+        """
+        Validate content and receivers of a message by message definition.
+        """
+        return self.meta.message_definition.model_validate(
+            {**content, "users": list(users), "endpoints": list(endpoints)}
+        )
+
     async def send(self, message: BaseModel) -> ProcessResult:
         raise NotImplementedError
 
+    async def send_batch(
+        self, messages: typing.Sequence[BaseModel]
+    ) -> typing.List[typing.List[ProcessResult]]:
+        """
+        Send many messages at once.
+
+        Providers able to send many messages or recipients by one request
+        should override it, by default messages are sent one by one.
+
+        Returns:
+            list[list[ProcessResult]]: Results of each message, by recipients.
+        """
+        results = await asyncio.gather(
+            *(self.send(message) for message in messages), return_exceptions=True
+        )
+        return [
+            [
+                ProcessResult(status="failed", error_message=str(result))
+                if isinstance(result, Exception)
+                else result
+            ]
+            for result in results
+        ]
+
     async def recv(self, bulk_size: int = None) -> ProcessResult:
         raise NotImplementedError
 
     async def is_avaliable(self) -> bool:
         raise NotImplementedError
+
+    async def close(self) -> None:
+        """
+        Release live clients of the provider, when it is evicted from cache.
+        """
+
+    @classmethod
+    def get_http_client(cls) -> httpx.AsyncClient:
+        """
+        Get the http client shared by all providers, create it if not exists.
+        """
+        if ProviderBase.http_client is None or ProviderBase.http_client.is_closed:
+            ProviderBase.http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0),
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return ProviderBase.http_client
+
+    @classmethod
+    async def close_http_client(cls) -> None:
+        if ProviderBase.http_client is not None:
+            await ProviderBase.http_client.aclose()
+            ProviderBase.http_client = None
@@ -1,9 +1,15 @@
 # Standard Library
+import asyncio
+import mimetypes
+import os
+import smtplib
 import typing
+from contextlib import suppress
+from email.message import EmailMessage
+from urllib.parse import urlparse
 
 # Third Party Library
-from apprise import Apprise
-from apprise import NotifyFormat
+import httpx
 from message.providers.abc import MessageDefinition
 from message.providers.abc import ProcessResult
 from message.providers.abc import ProviderBase
@@ -11,6 +17,9 @@ from pydantic import BaseModel
 from pydantic import Field
 from pydantic import field_serializer
 
+# seconds to wait for the mail server
+SMTP_TIMEOUT = 30
+
 
 class EmailConnectionDefinition(BaseModel):
     """
@@ -65,11 +74,13 @@ class EmailMessageDefinition(MessageDefinition):
 
 class EmailProvider(ProviderBase):
     """
-    Email provider implementation using apprise library.
+    Email provider implementation using smtplib.
 
     This provider allow sending email messages to endpoints.
 
     Full support of email, like HTML content, attachments, cc, bcc, from_address, etc.
+    Attachments are paths of local files or http urls, urls are downloaded by
+    the http client shared by providers.
     """
 
     class Meta:
@@ -83,83 +94,213 @@ class EmailProvider(ProviderBase):
         connection_definition = EmailConnectionDefinition
         message_definition = EmailMessageDefinition
 
+    def __init__(self, connection_params: typing.Union[dict, BaseModel]) -> None:
+        super().__init__(connection_params)
+        # kept connected across sends, as instances are cached per provider
+        self.smtp: typing.Optional[smtplib.SMTP] = None
+        self.smtp_lock = asyncio.Lock()
+
+    @property
+    def sender(self) -> str:
+        if from_address := self.connection_params.from_address:
+            return from_address
+        if "@" in self.connection_params.username:
+            return self.connection_params.username
+        return f"{self.connection_params.username}@{self.connection_params.domain}"
+
     async def send(self, message: "EmailMessageDefinition") -> ProcessResult:
-        if not isinstance(message, EmailMessageDefinition):
-            return ProcessResult(
-                status="failed",
-                error_message="`message` must be a valid instance of EmailMessageDefinition",
+        [results] = await self.send_batch([message])
+        failed = [result for result in results if result.status == "failed"]
+        return ProcessResult(
+            status="failed" if failed else "success",
+            error_message="; ".join(
+                f"{result.recipient}: {result.error_message}"
+                if result.recipient
+                else result.error_message
+                for result in failed
             )
+            or None,
+        )
 
-        apprise = Apprise()
-
-        # build notify url in format of apprise
-        notify_pattern = "{protocol}://{username}:{password}@{server}"
+    async def send_batch(
+        self, messages: typing.Sequence["EmailMessageDefinition"]
+    ) -> typing.List[typing.List[ProcessResult]]:
+        """
+        Send emails over one smtp session, with receivers of all emails
+        resolved together, results are listed by recipients of each email.
+        """
+        results: typing.List[typing.List[ProcessResult]] = [[] for _ in messages]
+        emails = []
+        for index, message in enumerate(messages):
+            if isinstance(message, EmailMessageDefinition):
+                emails.append((index, message))
+            else:
+                results[index].append(
+                    ProcessResult(
+                        status="failed",
+                        error_message="`message` must be a valid instance of EmailMessageDefinition",
+                    )
+                )
 
-        if self.connection_params.secure:
-            protocol = "mailtos"
-        else:
-            protocol = "mailto"
+        await self.resolve_recipients([message for _, message in emails])
 
-        if self.connection_params.port:
-            server = f"{self.connection_params.domain}:{self.connection_params.port}"
-        else:
-            server = self.connection_params.domain
+        if emails:
+            notified = await self.notify_by_smtp([message for _, message in emails])
+            for (index, _), recipient_results in zip(emails, notified):
+                results[index].extend(recipient_results)
+        return results
 
-        notify_url = notify_pattern.format(
-            protocol=protocol,
-            username=self.connection_params.username,
-            password=self.connection_params.password,
-            server=server,
+    async def resolve_recipients(
+        self, messages: typing.Sequence["EmailMessageDefinition"]
+    ) -> None:
+        """
+        Add addresses of users and endpoints to recipients of messages.
+        """
+        endpoint_application = self.applications.endpoint_application()
+        recipients = await endpoint_application.expand_recipients(
+            users=(user for message in messages for user in message.users),
+            endpoints=(
+                endpoint for message in messages for endpoint in message.endpoints
+            ),
+            contact_codes=self.meta.supported_contacts,
         )
+        for message in messages:
+            for user in message.users:
+                message.to.extend(recipients.of_users.get(user, []))
+            for endpoint in message.endpoints:
+                if (address := recipients.of_endpoints.get(int(endpoint))) is not None:
+                    message.to.append(address)
 
-        if message.users:
-            endpoint_application = self.applications.endpoint_application()
-            qs = await endpoint_application.get_queryset(
-                filters={
-                    "user_id__in": message.users,
-                    "contact__code__in": self.meta.supported_contacts,
-                }
+    async def notify_by_smtp(
+        self, messages: typing.Sequence["EmailMessageDefinition"]
+    ) -> typing.List[typing.List[ProcessResult]]:
+        """
+        Send emails over the pooled smtp connection of this provider.
+        """
+        emails, failed = [], {}
+        for index, message in enumerate(messages):
+            email = EmailMessage()
+            email["Subject"] = message.title
+            email["From"] = self.sender
+            email["To"] = ", ".join(message.to or [self.sender])
+            if message.cc:
+                email["Cc"] = ", ".join(message.cc)
+            email.set_content(message.content, subtype=message.content_type)
+            recipients = [*(message.to or [self.sender]), *message.cc, *message.bcc]
+            try:
+                for attachment in message.attachments:
+                    await self.attach(email, attachment)
+            except (OSError, httpx.HTTPError) as error:
+                failed[index] = f"Failed to attach file: {error}"
+            emails.append((email, recipients))
+
+        sendable = [email for index, email in enumerate(emails) if index not in failed]
+        async with self.smtp_lock:
+            sent = iter(await asyncio.to_thread(self.send_by_smtp, sendable))
+        # emails failed to attach files are refused for all recipients
+        refused = [
+            (
+                {recipient: failed[index] for recipient in recipients}
+                if index in failed
+                else next(sent)
             )
-            async for endpoint in qs.select_related("contact"):
-                validated = await endpoint.contact.validate_endpoint_value(
-                    endpoint.value
+            for index, (_, recipients) in enumerate(emails)
+        ]
+
+        return [
+            [
+                ProcessResult(
+                    status="failed" if recipient in errors else "success",
+                    error_message=errors.get(recipient),
+                    recipient=recipient,
                 )
-                message.to.append(validated.validated_data)
-
-        if message.endpoints:
-            endpoint_application = self.applications.endpoint_application()
-            qs = await endpoint_application.get_queryset(
-                filters={
-                    "id__in": message.endpoints,
-                    "contact__code__in": self.meta.supported_contacts,
+                for recipient in recipients
+            ]
+            for (_, recipients), errors in zip(emails, refused)
+        ]
+
+    def send_by_smtp(
+        self, emails: typing.List[typing.Tuple[EmailMessage, typing.List[str]]]
+    ) -> typing.List[typing.Dict[str, str]]:
+        """
+        Send emails one by one, returns errors of refused recipients.
+        """
+        refused = []
+        for email, recipients in emails:
+            try:
+                errors = self.send_one_by_smtp(email, recipients)
+            except smtplib.SMTPRecipientsRefused as error:
+                errors = error.recipients
+            except (OSError, smtplib.SMTPException) as error:
+                if isinstance(error, OSError):
+                    self.smtp = None
+                errors = {recipient: str(error) for recipient in recipients}
+            refused.append(
+                {
+                    recipient: (
+                        error
+                        if isinstance(error, str)
+                        else f"{error[0]} {error[1].decode(errors='replace')}"
+                    )
+                    for recipient, error in errors.items()
                 }
             )
-            async for endpoint in qs.select_related("contact"):
-                validated = await endpoint.contact.validate_endpoint_value(
-                    endpoint.value
-                )
-                message.to.append(validated.validated_data)
+        return refused
 
-        queries = message.model_dump(include=("to", "cc", "bcc"))
+    def send_one_by_smtp(
+        self, email: EmailMessage, recipients: typing.List[str]
+    ) -> typing.Dict[str, typing.Tuple[int, bytes]]:
+        # the server may have closed an idle connection, reconnect once
+        for retry in (False, True):
+            if self.smtp is None:
+                self.smtp = self.connect_smtp()
+            try:
+                return self.smtp.send_message(email, to_addrs=recipients)
+            except smtplib.SMTPServerDisconnected:
+                self.smtp = None
+                if retry:
+                    raise
 
-        if from_address := self.connection_params.from_address:
-            queries["from"] = from_address
-
-        notify_url = notify_url + "?" + "&".join(f"{k}={v}" for k, v in queries.items())
-        apprise.add(notify_url)
-
-        notified = await apprise.async_notify(
-            body=message.content,
-            title=message.title,
-            attach=message.attachments,
-            body_format=(
-                NotifyFormat.TEXT
-                if message.content_type == "plain"
-                else NotifyFormat.HTML
-            ),
-        )
+    def connect_smtp(self) -> smtplib.SMTP:
+        params = self.connection_params
+        if params.secure and params.port == 465:
+            smtp = smtplib.SMTP_SSL(params.domain, params.port, timeout=SMTP_TIMEOUT)
+        else:
+            port = params.port or (587 if params.secure else 25)
+            smtp = smtplib.SMTP(params.domain, port, timeout=SMTP_TIMEOUT)
+            if params.secure:
+                smtp.starttls()
+        smtp.login(params.username, params.password)
+        return smtp
 
-        return ProcessResult(
-            status="success" if notified else "failed",
-            error_message=None if notified else "Failed to send email",
+    async def close(self) -> None:
+        async with self.smtp_lock:
+            if self.smtp is not None:
+                smtp, self.smtp = self.smtp, None
+                with suppress(OSError, smtplib.SMTPException):
+                    await asyncio.to_thread(smtp.quit)
+
+    async def attach(self, email: EmailMessage, attachment: str) -> None:
+        """
+        Attach a local file or a file downloaded from http url to email.
+        """
+        url = urlparse(attachment)
+        if url.scheme in ("http", "https"):
+            response = await self.get_http_client().get(attachment)
+            response.raise_for_status()
+            content = response.content
+            filename = os.path.basename(url.path) or "attachment"
+        else:
+            path = url.path if url.scheme == "file" else attachment
+            content = await asyncio.to_thread(_read_file, path)
+            filename = os.path.basename(path)
+        mimetype, _ = mimetypes.guess_type(filename)
+        maintype, subtype = (mimetype or "application/octet-stream").split("/", 1)
+        email.add_attachment(
+            content, maintype=maintype, subtype=subtype, filename=filename
         )
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
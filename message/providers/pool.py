@@ -0,0 +1,126 @@
+# Standard Library
+import asyncio
+import hashlib
+import typing
+from collections import OrderedDict
+from contextlib import suppress
+
+# Third Party Library
+import orjson
+from message.common.constants import INVALIDATION_RETRY_DELAY
+from message.common.constants import INVALIDATION_RETRY_MAX_DELAY
+from message.common.constants import PROVIDER_INSTANCE_CACHE_SIZE
+from message.common.constants import PROVIDER_INSTANCE_CHANNEL
+from message.infra import get_infra
+from message.providers.abc import ProviderBase
+from message.providers.abc import get_provider_class
+
+if typing.TYPE_CHECKING:
+    # Third Party Library
+    from message import models
+
+__all__ = [
+    "ProviderInstanceCache",
+    "provider_instances",
+]
+
+
+def hash_connection_params(connection_params: dict) -> str:
+    return hashlib.sha1(
+        orjson.dumps(connection_params, option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+
+
+class ProviderInstanceCache:
+    """
+    LRU cache of provider instances, which keep their clients connected.
+
+    Instances are keyed by id of the provider and hash of its connection
+    params, so an updated provider misses the cache of every process and is
+    built again. Instances of updated or deleted providers are also dropped
+    by every process, once the provider is published as invalidated.
+    """
+
+    def __init__(self, maxsize: int = PROVIDER_INSTANCE_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.instances: OrderedDict[
+            typing.Tuple[int, str], ProviderBase
+        ] = OrderedDict()
+        self.listener: typing.Optional[asyncio.Task] = None
+
+    async def get(self, provider: "models.Provider") -> ProviderBase:
+        """
+        Get instance of a provider, with `provider_template` fetched.
+        """
+        if self.listener is None:
+            self.listener = asyncio.create_task(self.listen())
+        key = (provider.id, hash_connection_params(provider.connection_params))
+        if (instance := self.instances.get(key)) is not None:
+            self.instances.move_to_end(key)
+            return instance
+
+        provider_class = get_provider_class(provider.provider_template.code)
+        instance = provider_class(provider.connection_params)
+        self.instances[key] = instance
+
+        evicted = []
+        while len(self.instances) > self.maxsize:
+            evicted.append(self.instances.popitem(last=False)[1])
+        await self.close(*evicted)
+        return instance
+
+    async def invalidate(self, *provider_ids: int) -> None:
+        """
+        Drop instances of providers in all processes, after they are updated
+        or deleted.
+        """
+        provider_ids = [int(provider_id) for provider_id in provider_ids]
+        if not provider_ids:
+            return
+        await self.drop(*provider_ids)
+        with suppress(Exception):
+            distribution = await get_infra().distribution()
+            await distribution.publish(PROVIDER_INSTANCE_CHANNEL, provider_ids)
+
+    async def drop(self, *provider_ids: int) -> None:
+        keys = [key for key in self.instances if key[0] in provider_ids]
+        await self.close(*(self.instances.pop(key) for key in keys))
+
+    async def listen(self) -> None:
+        """
+        Drop instances of providers invalidated by other processes, listen
+        again after failures with backoff.
+        """
+        delay = INVALIDATION_RETRY_DELAY
+        while True:
+            try:
+                distribution = await get_infra().distribution()
+                async with distribution.listen(PROVIDER_INSTANCE_CHANNEL) as ids:
+                    delay = INVALIDATION_RETRY_DELAY
+                    async for provider_ids in ids:
+                        await self.drop(*provider_ids)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                print(err)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, INVALIDATION_RETRY_MAX_DELAY)
+
+    async def clear(self) -> None:
+        if self.listener is not None:
+            self.listener.cancel()
+            self.listener = None
+        instances = list(self.instances.values())
+        self.instances.clear()
+        await self.close(*instances)
+        await ProviderBase.close_http_client()
+
+    async def close(self, *instances: ProviderBase) -> None:
+        if instances:
+            await asyncio.gather(
+                *(instance.close() for instance in instances),
+                return_exceptions=True,
+            )
+
+
+provider_instances = ProviderInstanceCache()
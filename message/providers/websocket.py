@@ -2,12 +2,15 @@
 import typing
 
 # Third Party Library
+from message.infra import get_infra
+from message.providers.abc import MessageDefinition
+from message.providers.abc import ProcessResult
+from message.providers.abc import ProviderBase
+from pydantic import BaseModel
+from pydantic import Field
 from pydantic import RootModel
 
-# Local Folder
-from .abc import ProviderBase
-
-WebsocketMessageDefinition = RootModel[
+WebsocketMessageContent = RootModel[
     typing.Union[
         str,
         int,
@@ -19,10 +22,60 @@ WebsocketMessageDefinition = RootModel[
 ]
 
 
+class WebsocketConnectionDefinition(BaseModel):
+    """
+    Websocket provider sends by websocket infrastructure, nothing to connect.
+    """
+
+
+class WebsocketMessageDefinition(MessageDefinition):
+    """
+    Definition of a websocket message.
+
+    Args:
+        content (str | int | bool | float | list | dict): The content to send. Required.
+        topics (List[str], optional): Topics to send the message to besides users. Defaults to None.
+    """
+
+    content: WebsocketMessageContent
+    topics: typing.List[str] = Field(default_factory=list)
+
+
 class WebsocketProvider(ProviderBase):
-    name: str = "websocket"
-    description = "websocket provider"
+    """
+    Websocket provider sends messages to connections of users and topics.
+
+    Connections of a user subscribe topic of the user by its external id.
+    """
+
+    class Meta:
+        name = "Websocket"
+        code = "websocket"
+        description = "Websocket provider sends messages to online users and topics"
+
+        can_send = True
+        can_recv = False
+
+        connection_definition = WebsocketConnectionDefinition
+        message_definition = WebsocketMessageDefinition
+
+    async def send(self, message: "WebsocketMessageDefinition") -> ProcessResult:
+        if not isinstance(message, WebsocketMessageDefinition):
+            return ProcessResult(
+                status="failed",
+                error_message="`message` must be a valid instance of WebsocketMessageDefinition",
+            )
+
+        websocket = await get_infra().websocket()
+        content = message.content.model_dump()
+
+        if message.users:
+            user_application = self.applications.user_application()
+            qs = await user_application.get_queryset(filters={"id__in": message.users})
+            external_ids = await qs.values_list("external_id", flat=True)
+            await websocket.send_to_users(content, external_ids)
+
+        if message.topics:
+            await websocket.publish(content, *message.topics)
 
-    # ability
-    can_send = True
-    can_read = True
+        return ProcessResult(status="success")
@@ -9,6 +9,7 @@ if typing.TYPE_CHECKING:
     # Third Party Library
     from message.applications.contact import ContactApplication
     from message.applications.endpoint import EndpointApplication
+    from message.applications.endpoint import EndpointImportApplication
     from message.applications.health import HealthApplication
     from message.applications.message import MessageApplication
     from message.applications.provider import ProviderApplication
@@ -31,6 +32,11 @@ def get_application(name: str):
             from message.applications.endpoint import EndpointApplication
 
             return EndpointApplication()
+        case "endpoint_import":
+            # Third Party Library
+            from message.applications.endpoint import EndpointImportApplication
+
+            return EndpointImportApplication()
         case "health":
             # Third Party Library
             from message.applications.health import HealthApplication
@@ -67,6 +73,9 @@ class ApplicationContainer(DeclarativeContainer):
     endpoint_application: typing.Callable[
         ..., "EndpointApplication"
     ] = providers.Singleton(get_application, name="endpoint")
+    endpoint_import_application: typing.Callable[
+        ..., "EndpointImportApplication"
+    ] = providers.Singleton(get_application, name="endpoint_import")
     health_application: typing.Callable[..., "HealthApplication"] = providers.Singleton(
         get_application, name="health"
     )
@@ -3,6 +3,8 @@ import taskiq_fastapi
 from dependency_injector.containers import DeclarativeContainer
 from dependency_injector.providers import Configuration
 from message.common.constants import SETTINGS_YAML
+from taskiq import TaskiqEvents
+from taskiq import TaskiqState
 from taskiq_aio_pika import AioPikaBroker
 
 
@@ -20,3 +22,14 @@ broker = AioPikaBroker(
 )
 
 taskiq_fastapi.init(broker, "message.main:app")
+
+
+@broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+async def close_provider_instances(state: TaskiqState) -> None:
+    """
+    Close connections kept by cached provider instances.
+    """
+    # Third Party Library
+    from message.providers.pool import provider_instances
+
+    await provider_instances.clear()
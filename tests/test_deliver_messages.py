@@ -0,0 +1,184 @@
+# Standard Library
+import asyncio
+from types import SimpleNamespace
+
+# Third Party Library
+import orjson
+from assertpy import assert_that
+from dependency_injector import providers
+from message.common.constants import MessageStatusEnum
+from message.helpers.delivery import DeliveryLimits
+from message.helpers.delivery import delivery_limiter
+from message.helpers.signals import deliver_messages
+from message.providers.abc import ProcessResult
+from message.wiring import ApplicationContainer
+
+
+class FakeMessageApplication:
+    def __init__(self):
+        self.transitions = []
+
+    async def update_status(self, message, status, results=None):
+        self.transitions.append((message.id, status, results))
+        message.status = status
+        return message
+
+
+class FakeProviderInstance:
+    def __init__(self, error=None):
+        self.error = error
+        self.batches = []
+
+    def parse_message(self, content, users, endpoints):
+        if "text" not in content:
+            raise ValueError("text is required")
+        return {**content, "users": users, "endpoints": endpoints}
+
+    async def send_batch(self, definitions):
+        self.batches.append(definitions)
+        if self.error is not None:
+            raise self.error
+        return [
+            [
+                ProcessResult(status="failed", error_message="rejected")
+                if definition["text"] == "reject"
+                else ProcessResult(status="success")
+            ]
+            for definition in definitions
+        ]
+
+
+class FakeLimiterScripts:
+    """
+    Scripts of `delivery_limiter` without redis, which records tokens taken.
+    The bucket is refilled only after a caller has waited for it.
+    """
+
+    def __init__(self, tokens=None):
+        self.tokens = tokens
+        self.taken = []
+        self.waits = 0
+        self.released = []
+
+    async def take_tokens(self, keys, args):
+        rate, burst, requested = args
+        if self.tokens is not None:
+            if self.tokens < requested:
+                self.tokens = burst
+                self.waits += 1
+                return 10
+            self.tokens -= requested
+        self.taken.append(requested)
+        return 0
+
+    async def acquire(self, keys, args):
+        return 1
+
+    async def renew(self, keys, args):
+        return 1
+
+    async def zrem(self, key, token):
+        self.released.append(token)
+
+    def install(self):
+        delivery_limiter.scripts = (self.take_tokens, self.acquire, self.renew, self)
+
+
+class FakeProviderApplication:
+    def __init__(self, instance):
+        self.instance = instance
+
+    async def get_provider_instance(self, provider):
+        return self.instance
+
+
+def make_messages(*texts, code="email"):
+    provider = SimpleNamespace(id=1, provider_template=SimpleNamespace(code=code))
+    return [
+        SimpleNamespace(
+            id=id,
+            provider=provider,
+            content=orjson.dumps({} if text is None else {"text": text}).decode(),
+            users=[SimpleNamespace(id=1)],
+            endpoints=[],
+        )
+        for id, text in enumerate(texts, start=1)
+    ]
+
+
+async def deliver(instance, messages, scripts=None):
+    message_application = FakeMessageApplication()
+    scripts = scripts or FakeLimiterScripts()
+    scripts.install()
+    ApplicationContainer.provider_application.override(
+        providers.Object(FakeProviderApplication(instance))
+    )
+    try:
+        await deliver_messages(message_application, messages)
+    finally:
+        ApplicationContainer.provider_application.reset_override()
+        delivery_limiter.scripts = None
+    return message_application.transitions, scripts
+
+
+def test_deliver_messages_updates_status_by_results():
+    instance = FakeProviderInstance()
+    messages = make_messages("hello", "reject", None)
+    transitions, scripts = asyncio.run(deliver(instance, messages))
+
+    # invalid content fails without being sent
+    assert_that(instance.batches).is_length(1)
+    assert_that(instance.batches[0]).extracting("text").is_equal_to(["hello", "reject"])
+    assert_that(scripts.taken).is_equal_to([2])
+    assert_that(scripts.released).is_length(1)
+    assert_that([status for id, status, _ in transitions if id == 3]).is_equal_to(
+        [MessageStatusEnum.FAILED]
+    )
+    assert_that([status for id, status, _ in transitions if id == 1]).is_equal_to(
+        [MessageStatusEnum.SENDING, MessageStatusEnum.SUCCEEDED]
+    )
+    assert_that([status for id, status, _ in transitions if id == 2]).is_equal_to(
+        [MessageStatusEnum.SENDING, MessageStatusEnum.FAILED]
+    )
+    assert_that(messages[1].status).is_equal_to(MessageStatusEnum.FAILED)
+    assert_that(transitions[-1][2]).extracting("error_message").is_equal_to(
+        ["rejected"]
+    )
+
+
+def test_deliver_messages_fails_batch_when_sending_raises():
+    instance = FakeProviderInstance(error=ConnectionError("smtp is down"))
+    messages = make_messages("hello", "world")
+    try:
+        asyncio.run(deliver(instance, messages))
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("error of sending should be raised")
+
+    for message in messages:
+        assert_that(message.status).is_equal_to(MessageStatusEnum.FAILED)
+
+
+def test_deliver_messages_splits_burst_into_queued_batches():
+    delivery_limiter.limits["burst"] = DeliveryLimits(burst=2)
+    instance = FakeProviderInstance()
+    messages = make_messages("a", "b", "c", "d", "e", code="burst")
+    scripts = FakeLimiterScripts(tokens=2)
+    try:
+        transitions, _ = asyncio.run(deliver(instance, messages, scripts))
+    finally:
+        delivery_limiter.limits.pop("burst")
+
+    # batches never exceed burst, and the ones over limits wait for tokens
+    assert_that(
+        sorted(
+            [definition["text"] for definition in batch] for batch in instance.batches
+        )
+    ).is_equal_to([["a", "b"], ["c", "d"], ["e"]])
+    assert_that(sorted(scripts.taken)).is_equal_to([1, 2, 2])
+    assert_that(scripts.waits).is_greater_than_or_equal_to(2)
+    assert_that(scripts.released).is_length(3)
+    for message in messages:
+        assert_that(message.status).is_equal_to(MessageStatusEnum.SUCCEEDED)
+    assert_that(transitions).extracting(1).does_not_contain(MessageStatusEnum.FAILED)
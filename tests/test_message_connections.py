@@ -0,0 +1,123 @@
+# Standard Library
+import asyncio
+
+# Third Party Library
+from assertpy import assert_that
+from dependency_injector import providers
+from message import models
+from message.apis import schema
+from message.wiring import ApplicationContainer
+from strawberry import relay
+from tortoise import Tortoise
+from tortoise.utils import get_schema_sql
+
+MESSAGES_QUERY = """
+query Messages($page: Int, $pageSize: Int) {
+  messages(page: $page, pageSize: $pageSize) {
+    edges {
+      node {
+        id
+      }
+    }
+  }
+}
+"""
+
+MESSAGES_BY_CURSOR_QUERY = """
+query MessagesByCursor($first: Int, $after: String) {
+  messagesByCursor(first: $first, after: $after) {
+    edges {
+      node {
+        id
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+"""
+
+
+class MessageApplication:
+    """
+    Message application without the infra check, which needs postgres.
+    """
+
+    async def get_many(self, filters):
+        return models.Message.active_objects.filter(**filters)
+
+
+async def init_database():
+    await Tortoise.init(
+        db_url="sqlite://:memory:", modules={"models": ["message.models"]}
+    )
+    # sqlite has no GIN index of provider tags, which is not needed here
+    connection = Tortoise.get_connection("default")
+    statements = get_schema_sql(connection, safe=False).split(";")
+    await connection.execute_script(
+        ";".join(statement for statement in statements if "USING" not in statement)
+    )
+
+
+async def run_with_messages(paginate, count=5):
+    """
+    Run `paginate` with ids of `count` messages, newest first.
+    """
+    await init_database()
+    ApplicationContainer.message_application.override(
+        providers.Object(MessageApplication())
+    )
+    try:
+        template = await models.ProviderTemplate.create(name="Email", code="email")
+        provider = await models.Provider.create(
+            provider_template=template, alias="email"
+        )
+        messages = [
+            await models.Message.create(provider=provider) for _ in range(count)
+        ]
+        await paginate([message.id for message in reversed(messages)])
+    finally:
+        ApplicationContainer.message_application.reset_override()
+        await Tortoise.close_connections()
+
+
+def node_ids(connection):
+    return [
+        int(relay.GlobalID.from_id(edge["node"]["id"]).node_id)
+        for edge in connection["edges"]
+    ]
+
+
+async def paginate_messages(ids):
+    result = await schema.execute(
+        MESSAGES_QUERY, variable_values={"page": 2, "pageSize": 2}
+    )
+    assert_that(result.errors).is_none()
+    assert_that(node_ids(result.data["messages"])).is_length(2).is_subset_of(ids)
+
+
+async def paginate_messages_by_cursor(ids):
+    pages, after = [], None
+    while True:
+        result = await schema.execute(
+            MESSAGES_BY_CURSOR_QUERY,
+            variable_values={"first": 2, "after": after},
+        )
+        assert_that(result.errors).is_none()
+        connection = result.data["messagesByCursor"]
+        pages.append(node_ids(connection))
+        if not connection["pageInfo"]["hasNextPage"]:
+            break
+        after = connection["pageInfo"]["endCursor"]
+
+    assert_that(pages).is_equal_to([ids[0:2], ids[2:4], ids[4:]])
+
+
+def test_messages_pages_by_page_size():
+    asyncio.run(run_with_messages(paginate_messages))
+
+
+def test_messages_by_cursor_pages_with_first_and_after():
+    asyncio.run(run_with_messages(paginate_messages_by_cursor))
@@ -0,0 +1,54 @@
+# Standard Library
+import asyncio
+from types import SimpleNamespace
+
+# Third Party Library
+from assertpy import assert_that
+from message.providers.abc import get_provider_class
+from message.providers.email import EmailProvider
+from message.providers.pool import ProviderInstanceCache
+
+CONNECTION_PARAMS = {
+    "username": "noreply",
+    "password": "secret",
+    "domain": "mail.example.com",
+}
+
+
+def make_provider(id: int, code: str, **connection_params):
+    # the pool only reads these attributes of a provider
+    return SimpleNamespace(
+        id=id,
+        connection_params=connection_params,
+        provider_template=SimpleNamespace(code=code),
+    )
+
+
+async def build_provider_instances():
+    cache = ProviderInstanceCache(maxsize=1)
+    try:
+        provider = make_provider(1, "email", **CONNECTION_PARAMS)
+        instance = await cache.get(provider)
+        assert_that(instance).is_instance_of(EmailProvider)
+        assert_that(instance.connection_params.domain).is_equal_to("mail.example.com")
+        assert_that(await cache.get(provider)).is_same_as(instance)
+
+        # changed connection params build a new instance
+        provider.connection_params = {**CONNECTION_PARAMS, "port": 2525}
+        rebuilt = await cache.get(provider)
+        assert_that(rebuilt).is_not_same_as(instance)
+        assert_that(cache.instances).is_length(1)
+
+        await cache.drop(1)
+        assert_that(cache.instances).is_empty()
+    finally:
+        await cache.clear()
+
+
+def test_provider_classes_registered():
+    assert_that(get_provider_class("email")).is_equal_to(EmailProvider)
+    assert_that(get_provider_class("websocket").meta.can_send).is_true()
+
+
+def test_build_provider_instances():
+    asyncio.run(build_provider_instances())
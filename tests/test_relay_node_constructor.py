@@ -0,0 +1,88 @@
+# Standard Library
+import datetime
+import timeit
+
+# Third Party Library
+from assertpy import assert_that
+from message import models
+from message.apis.message.objecttypes import MessageTortoiseORMNode
+from message.common.constants import MessageStatusEnum
+
+PAGE_SIZE = 100
+ROUNDS = 20
+
+
+def make_messages(count: int):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    messages = []
+    for i in range(count):
+        message = models.Message(
+            id=i + 1,
+            provider_id=1,
+            content=f"content {i}",
+            contacts=[{"regex": f"user{i}@example.com"}],
+            status=MessageStatusEnum.SUCCEEDED,
+            status_history=[{"status": "pending"}, {"status": "succeeded"}],
+        )
+        message.created_at = message.updated_at = now
+        messages.append(message)
+    return messages
+
+
+def build_by_pydantic(messages):
+    # what connections did before: from_queryset, then validate again per node
+    pydantic_model = MessageTortoiseORMNode.__pydantic_model__
+    return [
+        MessageTortoiseORMNode(
+            **pydantic_model.model_validate(
+                pydantic_model.model_validate(message)
+            ).model_dump()
+        )
+        for message in messages
+    ]
+
+
+def build_by_orm(messages):
+    return [MessageTortoiseORMNode.from_orm(message) for message in messages]
+
+
+def build_by_values(rows):
+    return [MessageTortoiseORMNode.from_values(row) for row in rows]
+
+
+def test_node_constructor_matches_pydantic():
+    messages = make_messages(3)
+    expected = build_by_pydantic(messages)
+    assert_that(build_by_orm(messages)).is_equal_to(expected)
+
+    rows = [
+        {name: getattr(message, name) for name in ("id", "created_at", "status")}
+        for message in messages
+    ]
+    for node, message in zip(build_by_values(rows), expected):
+        assert_that(node.id).is_equal_to(message.id)
+        assert_that(node.status).is_equal_to(message.status)
+        assert_that(node.content).is_none()
+
+
+def test_node_constructor_speedup():
+    messages = make_messages(PAGE_SIZE)
+    rows = [
+        {name: getattr(message, name) for name in ("id", "created_at", "status")}
+        for message in messages
+    ]
+
+    pydantic_cost = timeit.timeit(lambda: build_by_pydantic(messages), number=ROUNDS)
+    orm_cost = timeit.timeit(lambda: build_by_orm(messages), number=ROUNDS)
+    values_cost = timeit.timeit(lambda: build_by_values(rows), number=ROUNDS)
+
+    per_row = 1e6 / (PAGE_SIZE * ROUNDS)
+    print(
+        f"\npydantic: {pydantic_cost * per_row:.2f}us/row, "
+        f"from_orm: {orm_cost * per_row:.2f}us/row "
+        f"({pydantic_cost / orm_cost:.1f}x), "
+        f"from_values: {values_cost * per_row:.2f}us/row "
+        f"({pydantic_cost / values_cost:.1f}x)"
+    )
+    assert_that(orm_cost).is_less_than(pydantic_cost)
+    assert_that(values_cost).is_less_than(pydantic_cost)
@@ -0,0 +1,87 @@
+# Standard Library
+import asyncio
+import gc
+import time
+
+# Third Party Library
+import orjson
+import pytest
+from assertpy import assert_that
+from message.infra.websocket import WebsocketInfrastructure
+from websocket_helpers import make_infra
+
+ROUNDS = 5
+
+MESSAGE = {
+    "type": "message",
+    "id": "01HMQ2X8K9Y6ZV3T5W7N4R2P1C",
+    "content": {
+        "title": "Scheduled maintenance",
+        "body": "The service will be unavailable from 02:00 to 04:00 UTC. " * 8,
+        "tags": ["maintenance", "notice", "system"],
+    },
+}
+
+
+def send_per_connection(infra: WebsocketInfrastructure):
+    # what fan-out did before: serialize the message for every receiver
+    for connection in infra.connections.values():
+        connection.enqueue(orjson.dumps(MESSAGE).decode())
+
+
+def drain(infra: WebsocketInfrastructure):
+    for connection in infra.connections.values():
+        connection.send_queue = None
+
+
+async def broadcast_shares_frame():
+    infra = make_infra(3, send_queue_size=ROUNDS)
+    assert_that(await infra.broadcast(MESSAGE)).is_equal_to(3)
+    frames = [c.send_queue.popleft()[1] for c in infra.connections.values()]
+    assert_that(orjson.loads(frames[0])).is_equal_to(MESSAGE)
+    assert_that({id(frame) for frame in frames}).is_length(1)
+
+
+def test_broadcast_shares_frame():
+    asyncio.run(broadcast_shares_frame())
+
+
+async def measure(count: int):
+    infra = make_infra(count, send_queue_size=ROUNDS)
+    # collections triggered by objects of other tests would skew the timings,
+    # as timeit does, garbage collection is off while measuring
+    gc.collect()
+    gc.disable()
+    try:
+        return await measure_fan_out(infra)
+    finally:
+        gc.enable()
+
+
+async def measure_fan_out(infra: WebsocketInfrastructure):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        send_per_connection(infra)
+    per_connection_cost = time.perf_counter() - start
+    drain(infra)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await infra.broadcast(MESSAGE)
+    broadcast_cost = time.perf_counter() - start
+    drain(infra)
+
+    return per_connection_cost, broadcast_cost
+
+
+@pytest.mark.parametrize("count", [1000, 10000])
+def test_broadcast_throughput(count):
+    per_connection_cost, broadcast_cost = asyncio.run(measure(count))
+    sent = count * ROUNDS
+    print(
+        f"\n{count} connections, "
+        f"per connection: {sent / per_connection_cost:,.0f} msg/s, "
+        f"broadcast: {sent / broadcast_cost:,.0f} msg/s "
+        f"({per_connection_cost / broadcast_cost:.1f}x)"
+    )
+    assert_that(broadcast_cost).is_less_than(per_connection_cost)
@@ -0,0 +1,73 @@
+# Standard Library
+import asyncio
+import time
+
+# Third Party Library
+from assertpy import assert_that
+from websocket_helpers import make_infra
+
+DISCONNECTS = 10000
+# the longest the event loop may be blocked while connections are closing,
+# which includes waking up all endpoints of the disconnected clients at once
+MAX_STALL = 0.2
+
+
+async def watch_stall(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """
+    Measure the longest time the event loop is late to wake up a sleeper.
+    """
+    stall = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stall = max(stall, time.perf_counter() - start - interval)
+    return stall
+
+
+async def disconnect_storm(count: int):
+    closed = []
+
+    async def release_presence(connection_id):
+        await asyncio.sleep(0)
+        closed.append(connection_id)
+
+    infra = make_infra(
+        count, close_callbacks=(release_presence, lambda connection_id: None)
+    )
+    disconnected = asyncio.Event()
+
+    async def endpoint(connection):
+        # what /websocket/ does once its client is gone
+        await disconnected.wait()
+        await infra.remove_connection(connection)
+
+    endpoints = [
+        asyncio.create_task(endpoint(connection))
+        for connection in infra.connections.values()
+    ]
+    await asyncio.sleep(0)
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_stall(stop))
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    disconnected.set()
+    await asyncio.wait(endpoints)
+    while infra.close_callback_runner.task is not None:
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    return elapsed, await watcher, closed, infra
+
+
+def test_disconnect_storm():
+    elapsed, stall, closed, infra = asyncio.run(disconnect_storm(DISCONNECTS))
+    print(
+        f"\n{DISCONNECTS} disconnects: {elapsed * 1000:.0f}ms in total, "
+        f"event loop stalled {stall * 1000:.1f}ms at most"
+    )
+    assert_that(closed).is_length(DISCONNECTS)
+    assert_that(infra.connections).is_empty()
+    assert_that(stall).is_less_than(MAX_STALL)
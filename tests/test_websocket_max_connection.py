@@ -1,14 +1,22 @@
 # Standard Library
 import asyncio
 import functools
+import gc
 import itertools
 import os
 import time
+import tracemalloc
 from concurrent.futures import ProcessPoolExecutor
 from concurrent.futures import as_completed
 
 # Third Party Library
 import websockets
+from assertpy import assert_that
+from message.infra.websocket import WebsocketConnection
+
+MEMORY_CONNECTIONS = 10000
+# what a connection costs at most, besides the socket itself
+MAX_BYTES_PER_CONNECTION = 1024
 
 
 async def connect(ws_url: str, close_flag: asyncio.Event):
@@ -60,6 +68,34 @@ def process_compatible_make_connection(ws_url: str, throughput: int = 100):
     return True
 
 
+class IdleWebSocket:
+    async def accept(self, subprotocol=None):
+        pass
+
+
+async def memory_per_connection(count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    connections = []
+    for i in range(count):
+        connection = WebsocketConnection(str(i), IdleWebSocket(), None)
+        await connection.init()
+        connections.append(connection)
+    # let tasks created by connections start
+    await asyncio.sleep(0)
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def test_memory_per_connection():
+    cost = asyncio.run(memory_per_connection(MEMORY_CONNECTIONS))
+    print(f"\n{MEMORY_CONNECTIONS} idle connections: {cost:.0f} bytes/connection")
+    assert_that(cost).is_less_than(MAX_BYTES_PER_CONNECTION)
+
+
 def main():
     ws_url = "wss://127.0.0.1:8000/websocket/"
     asyncio.run(max_acceptable_connections(ws_url))
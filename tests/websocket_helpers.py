@@ -0,0 +1,42 @@
+# Standard Library
+import typing
+
+# Third Party Library
+from message.infra.websocket import CloseCallbackRunner
+from message.infra.websocket import WebsocketConnection
+from message.infra.websocket import WebsocketInfrastructure
+
+
+class NullDistribution:
+    async def publish_raw(self, channel, data):
+        pass
+
+
+async def noop(*args):
+    pass
+
+
+def make_infra(
+    count: int, close_callbacks: typing.Iterable[typing.Callable] = (), **kwargs
+) -> WebsocketInfrastructure:
+    """
+    Build a websocket infrastructure holding `count` connections without
+    clients, nothing is sent to redis or other nodes.
+
+    `kwargs` are passed to every connection.
+    """
+    infra = WebsocketInfrastructure()
+    infra.id = "node"
+    infra.distribution = NullDistribution()
+    infra.close_callback_runner = CloseCallbackRunner()
+    infra.unregister_connections = noop
+
+    for i in range(count):
+        connection_id = f"connection-{i}"
+        connection = WebsocketConnection(
+            connection_id, None, infra.close_callback_runner, **kwargs
+        )
+        for close_callback in close_callbacks:
+            connection.add_close_callback(close_callback)
+        infra.connections[connection_id] = connection
+    return infra